@@ -38,41 +38,42 @@ class DataSet:
     @staticmethod
     def average_for_salary(dict):
         answer = {}
-        for key, values in dict.items():
-            answer[key] = int(sum(values) / len(values))
+        for key, (total, count) in dict.items():
+            answer[key] = int(total / count)
         return answer
 
     @staticmethod
     def augmentation(vacancy, amount, dict):
         if vacancy in dict:
-            dict[vacancy] += amount
+            dict[vacancy][0] += amount
+            dict[vacancy][1] += 1
         else:
-            dict[vacancy] = amount
+            dict[vacancy] = [amount, 1]
 
     def get_statistic(self):
         salary, salary_of_vacancy_name, salary_city, vacancies_count = {}, {}, {}, 0
 
         for vacancy_dict in self.csv_reader():
             vacancy = Vacancy(vacancy_dict)
-            self.augmentation(vacancy.year, [vacancy.salary_average], salary)
+            self.augmentation(vacancy.year, vacancy.salary_average, salary)
             if vacancy.name.find(self.vacancy_name) != -1:
-                self.augmentation(vacancy.year, [vacancy.salary_average], salary_of_vacancy_name)
-            self.augmentation(vacancy.area_name, [vacancy.salary_average], salary_city)
+                self.augmentation(vacancy.year, vacancy.salary_average, salary_of_vacancy_name)
+            self.augmentation(vacancy.area_name, vacancy.salary_average, salary_city)
             vacancies_count += 1
 
-        number_vacancies = dict([(key, len(value)) for key, value in salary.items()])
-        number_vacancies_by_name = dict([(key, len(value)) for key, value in salary_of_vacancy_name.items()])
+        number_vacancies = dict([(key, value[1]) for key, value in salary.items()])
+        number_vacancies_by_name = dict([(key, value[1]) for key, value in salary_of_vacancy_name.items()])
 
         if not salary_of_vacancy_name:
-            salary_of_vacancy_name = dict([(key, [0]) for key, value in salary.items()])
+            salary_of_vacancy_name = dict([(key, [0, 1]) for key, value in salary.items()])
             number_vacancies_by_name = dict([(key, 0) for key, value in number_vacancies.items()])
 
         value = self.average_for_salary(salary)
         value2 = self.average_for_salary(salary_of_vacancy_name)
         value3 = self.average_for_salary(salary_city)
         value4 = {}
-        for year, salaries in salary_city.items():
-            value4[year] = round(len(salaries) / vacancies_count, 4)
+        for city, (_, count) in salary_city.items():
+            value4[city] = round(count / vacancies_count, 4)
         value4 = list(filter(lambda a: a[-1] >= 0.01, [(key, value) for key, value in value4.items()]))
         value4.sort(key=lambda a: a[-1], reverse=True)
         value5 = value4.copy()
@@ -0,0 +1,246 @@
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent import futures
+
+import columnar
+import pdf_2_1_3
+
+FORMATS = {'xlsx': 'generate_excel', 'png': 'generate_image', 'pdf': 'generate_pdf'}
+
+
+class Job:
+    """
+    Задание пакетного запуска: отчет по одной профессии (и, если задан, региону) из одного csv файла.
+    Attributes:
+        number (int): Номер задания в файле заданий
+        file_name (str): Название csv файла
+        vacancy_name (str): Название профессии
+        region (str): Город, для которого считается статистика профессии, пустая строка - все города
+        formats (list): Форматы файлов отчета: xlsx, png, pdf
+        output_dir (str): Каталог для файлов отчета
+        timings (dict): Время этапов задания в секундах: parse - доля задания во времени общего разбора файла,
+            total - сумма этапов задания
+        ready_at (float): Когда (time.perf_counter) готова статистика задания
+        wall (float): Время задания от готовности статистики до последнего файла вместе с разбором и статистикой
+        error (str): Описание ошибки, если задание не выполнено
+    """
+    def __init__(self, number, file_name, vacancy_name, region, formats, output_dir):
+        """
+        Инициализирует объект Job.
+        Args:
+            number (int): Номер задания в файле заданий
+            file_name (str): Название csv файла
+            vacancy_name (str): Название профессии
+            region (str): Город, пустая строка - все города
+            formats (list): Форматы файлов отчета
+            output_dir (str): Каталог для файлов отчета
+        """
+        self.number = number
+        self.file_name = file_name
+        self.vacancy_name = vacancy_name
+        self.region = region
+        self.formats = formats
+        self.output_dir = output_dir
+        self.timings = {}
+        self.ready_at = None
+        self.wall = None
+        self.error = None
+
+    @property
+    def title(self):
+        """
+        Название отчета: профессия и город, если он задан.
+        Returns:
+            str: Название отчета
+        """
+        return '{0} ({1})'.format(self.vacancy_name, self.region) if self.region else self.vacancy_name
+
+    def add_timing(self, name, seconds):
+        """
+        Записывает время этапа и пересчитывает сумму этапов и время задания.
+        Args:
+            name (str): Этап
+            seconds (float): Время этапа в секундах
+        """
+        self.timings.pop('total', None)
+        self.timings[name] = seconds
+        self.timings['total'] = sum(self.timings.values())
+        if self.ready_at is not None:
+            self.wall = (self.timings.get('parse', 0) + self.timings.get('statistic', 0) + time.perf_counter()
+                         - self.ready_at)
+
+    def to_dict(self):
+        return {'number': self.number, 'file': self.file_name, 'profession': self.vacancy_name,
+                'region': self.region, 'formats': self.formats, 'output_dir': self.output_dir,
+                'timings': {name: round(value, 4) for name, value in self.timings.items()},
+                'wall_seconds': None if self.wall is None else round(self.wall, 4), 'error': self.error}
+
+
+def read_jobs(job_file, output_dir):
+    """
+    Читает файл заданий: csv со столбцами file, profession, region, formats.
+    region можно оставить пустым, formats - форматы через пробел (по умолчанию xlsx png pdf).
+    Каждое задание получает свой каталог внутри output_dir.
+    Args:
+        job_file (str): Файл заданий
+        output_dir (str): Каталог для отчетов
+    Returns:
+        list: Задания
+    """
+    jobs = []
+    with open(job_file, encoding='utf-8-sig', newline='') as file:
+        for number, row in enumerate(csv.DictReader(file), 1):
+            formats = (row.get('formats') or ' '.join(FORMATS)).split()
+            unknown = [name for name in formats if name not in FORMATS]
+            if unknown:
+                raise ValueError('Задание {0}: неизвестный формат {1}'.format(number, ', '.join(unknown)))
+            region = (row.get('region') or '').strip()
+            job = Job(number, row['file'], row['profession'], region, formats, None)
+            job.output_dir = os.path.join(output_dir, '{0:03}_{1}'.format(number, pdf_2_1_3.safe_name(job.title)))
+            jobs.append(job)
+    return jobs
+
+
+def file_statistics(file_name, queries, cache_dir=columnar.CACHE_DIR):
+    """
+    Разбирает csv файл один раз и считает статистику для всех заданий по этому файлу.
+    Args:
+        file_name (str): Название csv файла
+        queries (list): Пары (профессия, город) заданий
+        cache_dir (str): Каталог кэша столбцов, None - не использовать кэш
+    Returns:
+        tuple: Время разбора файла и для каждого задания пара (статистика, время подсчета)
+    """
+    start = time.perf_counter()
+    columns = columnar.load_columns(file_name, cache_dir)
+    parse_seconds = time.perf_counter() - start
+    results = []
+    for vacancy_name, region in queries:
+        start = time.perf_counter()
+        values = pdf_2_1_3.ColumnarDataSet.statistic_for(columns, vacancy_name, region)
+        results.append((values, time.perf_counter() - start))
+    return parse_seconds, results
+
+
+def error_text(error):
+    """
+    Кратко описывает ошибку задания.
+    Args:
+        error (Exception): Ошибка
+    Returns:
+        str: Тип ошибки и первая строка сообщения
+    """
+    return '{0}: {1}'.format(type(error).__name__, (str(error).splitlines() or [''])[0])
+
+
+def render(method, vacancy_name, values, output_dir, *args):
+    """
+    Создает один файл отчета и замеряет время.
+    Args:
+        method (str): Метод Report
+        vacancy_name (str): Название отчета
+        values (tuple): Словари статистики
+        output_dir (str): Каталог для файлов отчета
+        args: Аргументы метода
+    Returns:
+        tuple: Время создания файла и результат метода
+    """
+    start = time.perf_counter()
+    result = pdf_2_1_3.render_artifact(method, vacancy_name, values, output_dir, *args)
+    return time.perf_counter() - start, result
+
+
+def run_jobs(jobs, workers=None, cache_dir=columnar.CACHE_DIR):
+    """
+    Выполняет задания в пуле процессов. Каждый файл разбирается одним процессом один раз для всех его заданий,
+    после чего файлы отчетов всех заданий создаются параллельно; pdf ставится в очередь, как только готов
+    встраиваемый в него график. Ошибка в задании записывается в job.error и не останавливает остальные задания.
+    Args:
+        jobs (list): Задания
+        workers (int): Количество процессов, по умолчанию по числу процессоров
+        cache_dir (str): Каталог кэша столбцов, None - не использовать кэш
+    Returns:
+        list: Те же задания с заполненными timings и error
+    """
+    by_file = {}
+    for job in jobs:
+        by_file.setdefault(job.file_name, []).append(job)
+
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for file_name, file_jobs in by_file.items():
+            task = executor.submit(file_statistics, file_name, [(job.vacancy_name, job.region) for job in file_jobs],
+                                   cache_dir)
+            pending[task] = ('statistics', file_jobs, None)
+
+        def submit(job, method, values, *args):
+            task = executor.submit(render, method, job.title, values, job.output_dir, *args)
+            pending[task] = (method, job, values)
+
+        while pending:
+            done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for task in done:
+                kind, target, values = pending.pop(task)
+                if kind == 'statistics':
+                    try:
+                        parse_seconds, results = task.result()
+                    except Exception as error:
+                        for job in target:
+                            job.error = error_text(error)
+                        continue
+                    for job, (values, seconds) in zip(target, results):
+                        job.ready_at = time.perf_counter()
+                        job.add_timing('parse', parse_seconds / len(target))
+                        job.add_timing('statistic', seconds)
+                        os.makedirs(job.output_dir, exist_ok=True)
+                        if 'xlsx' in job.formats:
+                            submit(job, 'generate_excel', values)
+                        if 'pdf' in job.formats:
+                            submit(job, 'generate_image' if 'png' in job.formats else 'render_image', values)
+                        elif 'png' in job.formats:
+                            submit(job, 'generate_image', values)
+                    continue
+
+                job = target
+                try:
+                    seconds, result = task.result()
+                except Exception as error:
+                    job.error = job.error or error_text(error)
+                    continue
+                job.add_timing(kind, seconds)
+                if kind in ('generate_image', 'render_image') and 'pdf' in job.formats:
+                    submit(job, 'generate_pdf', values, result)
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Пакетное формирование отчетов по файлу заданий без ввода с клавиатуры')
+    parser.add_argument('jobs', help='csv файл заданий со столбцами file, profession, region, formats')
+    parser.add_argument('--output-dir', default='reports', help='каталог, в котором у каждого задания свой каталог')
+    parser.add_argument('--workers', type=int, help='количество процессов, по умолчанию по числу процессоров')
+    parser.add_argument('--no-columns-cache', action='store_true', help='не использовать кэш разобранных столбцов')
+    arguments = parser.parse_args()
+
+    jobs = read_jobs(arguments.jobs, arguments.output_dir)
+    start = time.perf_counter()
+    run_jobs(jobs, arguments.workers, None if arguments.no_columns_cache else columnar.CACHE_DIR)
+    total = time.perf_counter() - start
+
+    for job in jobs:
+        timings = ', '.join('{0} {1:.3f} с'.format(name, value) for name, value in job.timings.items())
+        wall = '' if job.wall is None else ', с разбором до последнего файла {0:.3f} с'.format(job.wall)
+        print('{0:3} {1}: {2}{3}{4}'.format(job.number, job.title, timings, wall,
+                                            '' if job.error is None else ' ОШИБКА ' + job.error))
+    print('Заданий: {0}, ошибок: {1}, всего {2:.3f} с'.format(len(jobs), sum(job.error is not None for job in jobs),
+                                                               total))
+    os.makedirs(arguments.output_dir, exist_ok=True)
+    with open(os.path.join(arguments.output_dir, 'jobs.json'), 'w', encoding='utf-8') as file:
+        json.dump({'total_seconds': round(total, 4), 'jobs': [job.to_dict() for job in jobs]},
+                  file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
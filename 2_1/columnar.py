@@ -0,0 +1,390 @@
+import array
+import csv
+import hashlib
+import os
+import shutil
+import tempfile
+
+import matcher
+import report_cache
+
+currency_to_rub = {
+    "AZN": 35.68, "BYR": 23.91, "EUR": 59.90, "GEL": 21.74, "KGS": 0.76,
+    "KZT": 0.13, "RUR": 1, "UAH": 1.64, "USD": 60.66, "UZS": 0.0055,
+}
+
+CACHE_DIR = '.columns_cache'
+content_hashes = {}
+
+
+class Columns:
+    """
+    Хранит вакансии в виде типизированных столбцов вместо словаря на каждую строку.
+    Строковые поля закодированы словарем: в столбце лежит код, а само значение - в списке уникальных значений.
+    Attributes:
+        salary_from (np.ndarray): Нижняя граница вилки оклада (float64)
+        salary_to (np.ndarray): Верхняя граница вилки оклада (float64)
+        year (np.ndarray): Год публикации (int16)
+        name_code (np.ndarray): Коды названий вакансий (int32)
+        area_code (np.ndarray): Коды городов (int32)
+        currency_code (np.ndarray): Коды валют (int8)
+        names (list): Уникальные названия вакансий в порядке первого появления
+        area_names (list): Уникальные города в порядке первого появления
+        currencies (list): Уникальные валюты в порядке первого появления
+    """
+    def __init__(self, salary_from, salary_to, year, name_code, area_code, currency_code,
+                 names, area_names, currencies):
+        """
+        Инициализирует объект Columns.
+        Args:
+            salary_from (np.ndarray): Нижняя граница вилки оклада
+            salary_to (np.ndarray): Верхняя граница вилки оклада
+            year (np.ndarray): Год публикации
+            name_code (np.ndarray): Коды названий вакансий
+            area_code (np.ndarray): Коды городов
+            currency_code (np.ndarray): Коды валют
+            names (list): Уникальные названия вакансий
+            area_names (list): Уникальные города
+            currencies (list): Уникальные валюты
+        """
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.year = year
+        self.name_code = name_code
+        self.area_code = area_code
+        self.currency_code = currency_code
+        self.names = names
+        self.area_names = area_names
+        self.currencies = currencies
+
+    def __len__(self):
+        return len(self.year)
+
+    def salary_average(self):
+        """
+        Считает среднюю зарплату в рублях для всех вакансий сразу.
+        Returns:
+            np.ndarray: Средние зарплаты (float64)
+        """
+        import numpy as np
+
+        rates = np.array([currency_to_rub[currency] for currency in self.currencies], dtype=np.float64)
+        return rates[self.currency_code] * (self.salary_from + self.salary_to) / 2
+
+    def name_mask(self, vacancy_name):
+        """
+        Отмечает вакансии, в названии которых встречается vacancy_name.
+        Поиск выполняется один раз для каждого уникального названия.
+        Args:
+            vacancy_name (str): Название профессии
+        Returns:
+            np.ndarray: Булев массив длиной в количество вакансий
+        """
+        import numpy as np
+
+        matches = np.array([name.find(vacancy_name) != -1 for name in self.names], dtype=bool)
+        return matches[self.name_code] if len(matches) else np.zeros(len(self), dtype=bool)
+
+    def area_mask(self, area_name):
+        """
+        Отмечает вакансии из города area_name.
+        Args:
+            area_name (str): Название города
+        Returns:
+            np.ndarray: Булев массив длиной в количество вакансий
+        """
+        import numpy as np
+
+        if area_name not in self.area_names:
+            return np.zeros(len(self), dtype=bool)
+        return self.area_code == self.area_names.index(area_name)
+
+    def iter_vacancies(self, mask=None, chunk_size=10000):
+        """
+        Выдает вакансии по одной в виде строк таблицы, не собирая их все в память.
+        Args:
+            mask (np.ndarray): Какие вакансии выдавать, по умолчанию все
+            chunk_size (int): Сколько вакансий переводить из массивов в списки за раз
+        Yields:
+            list: Название, нижняя и верхняя граница вилки оклада, валюта, город, год
+        """
+        import numpy as np
+
+        indexes = np.flatnonzero(mask) if mask is not None else np.arange(len(self))
+        for start in range(0, len(indexes), chunk_size):
+            chunk = indexes[start:start + chunk_size]
+            for name, salary_from, salary_to, currency, area, year in zip(
+                    self.name_code[chunk].tolist(), self.salary_from[chunk].tolist(), self.salary_to[chunk].tolist(),
+                    self.currency_code[chunk].tolist(), self.area_code[chunk].tolist(), self.year[chunk].tolist()):
+                yield [self.names[name], int(salary_from), int(salary_to), self.currencies[currency],
+                       self.area_names[area], year]
+
+    def group_by_year(self, values, mask=None):
+        """
+        Группирует значения по годам.
+        Args:
+            values (np.ndarray): Значения для суммирования
+            mask (np.ndarray): Какие вакансии учитывать, по умолчанию все
+        Returns:
+            dict: [сумма, количество] по годам в порядке первого появления года
+        """
+        import numpy as np
+
+        if len(self) == 0:
+            return {}
+        first_year = int(self.year.min())
+        codes = self.year.astype(np.intp) - first_year
+        keys = range(first_year, int(self.year.max()) + 1)
+        return self.group_sum_count(codes, keys, values, mask)
+
+    def group_by_area(self, values, mask=None):
+        """
+        Группирует значения по городам.
+        Args:
+            values (np.ndarray): Значения для суммирования
+            mask (np.ndarray): Какие вакансии учитывать, по умолчанию все
+        Returns:
+            dict: [сумма, количество] по городам в порядке первого появления города
+        """
+        return self.group_sum_count(self.area_code, self.area_names, values, mask)
+
+    def aggregate(self, vacancy_name, mask=None):
+        """
+        Считает суммы и количества, из которых DataSet.build_statistic строит статистику.
+        Args:
+            vacancy_name (str): Название профессии
+            mask (np.ndarray): Уже посчитанный name_mask(vacancy_name)
+        Returns:
+            tuple: salary, salary_of_vacancy_name, salary_city, vacancies_count
+        """
+        if mask is None:
+            mask = self.name_mask(vacancy_name)
+        salary_average = self.salary_average()
+        return (self.group_by_year(salary_average),
+                self.group_by_year(salary_average, mask),
+                self.group_by_area(salary_average),
+                len(self))
+
+    def aggregate_batch(self, vacancy_names):
+        """
+        Считает суммы и количества по годам сразу для многих профессий за один проход.
+        Названия вакансий проверяются автоматом Ахо-Корасик по одному разу на уникальное название,
+        а зарплаты один раз группируются по парам (название, год).
+        Args:
+            vacancy_names (list): Названия профессий
+        Returns:
+            dict: Для каждой профессии [сумма, количество] по годам в порядке первого появления года
+        """
+        import numpy as np
+
+        result = {vacancy_name: {} for vacancy_name in vacancy_names}
+        if len(self) == 0:
+            return result
+        first_year = int(self.year.min())
+        years_count = int(self.year.max()) - first_year + 1
+        pairs = self.name_code.astype(np.intp) * years_count + (self.year.astype(np.intp) - first_year)
+        size = len(self.names) * years_count
+        sums = np.bincount(pairs, weights=self.salary_average(), minlength=size).reshape(-1, years_count)
+        counts = np.bincount(pairs, minlength=size).reshape(-1, years_count)
+        first_index = np.full(size, len(self), dtype=np.intp)
+        unique, index = np.unique(pairs, return_index=True)
+        first_index[unique] = index
+        first_index = first_index.reshape(-1, years_count)
+
+        automaton = matcher.AhoCorasick(vacancy_names)
+        matched = [[] for _ in vacancy_names]
+        for code, name in enumerate(self.names):
+            for pattern in automaton.search(name):
+                matched[pattern].append(code)
+        for pattern, codes in enumerate(matched):
+            if not codes:
+                continue
+            year_sums = sums[codes].sum(axis=0)
+            year_counts = counts[codes].sum(axis=0)
+            year_first = first_index[codes].min(axis=0)
+            result[vacancy_names[pattern]] = {
+                first_year + int(year): [float(year_sums[year]), int(year_counts[year])]
+                for year in np.argsort(year_first, kind='stable') if year_counts[year]}
+        return result
+
+    @staticmethod
+    def group_sum_count(codes, keys, values, mask=None):
+        """
+        Векторная группировка: сумма и количество значений для каждого кода.
+        Args:
+            codes (np.ndarray): Коды групп
+            keys (list): Значение ключа для каждого кода
+            values (np.ndarray): Значения для суммирования
+            mask (np.ndarray): Какие строки учитывать, по умолчанию все
+        Returns:
+            dict: [сумма, количество] по ключам в порядке первого появления
+        """
+        import numpy as np
+
+        if mask is not None:
+            codes, values = codes[mask], values[mask]
+        sums = np.bincount(codes, weights=values, minlength=len(keys))
+        counts = np.bincount(codes, minlength=len(keys))
+        unique, first_index = np.unique(codes, return_index=True)
+        return {keys[code]: [float(sums[code]), int(counts[code])] for code in unique[np.argsort(first_index)]}
+
+
+def file_fingerprint(file_name):
+    """
+    Считает отпечаток файла по пути, размеру, времени изменения и хешу всего содержимого
+    (report_cache.content_hash). Хеш запоминается в процессе вместе с размером и временем изменения,
+    поэтому повторные вызовы для неизменного файла не перечитывают его.
+    Args:
+        file_name (str): Название файла
+    Returns:
+        tuple: Хеш пути и хеш размера, времени изменения и содержимого
+    """
+    path = os.path.abspath(file_name)
+    stat = os.stat(path)
+    version = (stat.st_size, stat.st_mtime_ns)
+    if content_hashes.get(path, (None, None))[0] != version:
+        content_hashes[path] = (version, report_cache.content_hash(path))
+    digest = hashlib.blake2b('{0}:{1}:{2}'.format(stat.st_size, stat.st_mtime_ns, content_hashes[path][1]).encode(),
+                             digest_size=16)
+    return hashlib.blake2b(path.encode(), digest_size=8).hexdigest(), digest.hexdigest()
+
+
+def save_columns(columns, directory):
+    """
+    Сохраняет столбцы в каталог по одному .npy файлу на столбец, чтобы их можно было отобразить в память.
+    Каталог заменяется целиком, поэтому читатели никогда не видят наполовину записанный кэш.
+    Args:
+        columns (Columns): Данные вакансий по столбцам
+        directory (str): Каталог для сохранения
+    """
+    import numpy as np
+
+    parent = os.path.dirname(directory) or '.'
+    os.makedirs(parent, exist_ok=True)
+    temp = tempfile.mkdtemp(dir=parent)
+    for key in ('salary_from', 'salary_to', 'year', 'name_code', 'area_code', 'currency_code'):
+        np.save(os.path.join(temp, key + '.npy'), getattr(columns, key))
+    for key in ('names', 'area_names', 'currencies'):
+        np.save(os.path.join(temp, key + '.npy'), np.array(getattr(columns, key), dtype=str))
+    try:
+        os.replace(temp, directory)
+    except OSError:
+        shutil.rmtree(temp, ignore_errors=True)
+
+
+def open_columns(directory):
+    """
+    Открывает сохраненные столбцы, числовые столбцы отображаются в память без чтения целиком.
+    Args:
+        directory (str): Каталог с сохраненными столбцами
+    Returns:
+        Columns: Данные вакансий по столбцам
+    """
+    import numpy as np
+
+    arrays = [np.load(os.path.join(directory, key + '.npy'), mmap_mode='r')
+              for key in ('salary_from', 'salary_to', 'year', 'name_code', 'area_code', 'currency_code')]
+    lists = [np.load(os.path.join(directory, key + '.npy')).tolist() for key in ('names', 'area_names', 'currencies')]
+    return Columns(*arrays, *lists)
+
+
+def load_columns(file_name, cache_dir=CACHE_DIR):
+    """
+    Возвращает столбцы из кэша, если файл не менялся, иначе разбирает csv файл и кэширует результат.
+    Устаревшие записи кэша для того же файла удаляются.
+    Args:
+        file_name (str): Название файла
+        cache_dir (str): Каталог кэша, None - не использовать кэш
+    Returns:
+        Columns: Данные вакансий по столбцам
+    """
+    if cache_dir is None:
+        return read_columns(file_name)
+    path_key, content_key = file_fingerprint(file_name)
+    directory = os.path.join(cache_dir, '{0}-{1}'.format(path_key, content_key))
+    if os.path.isdir(directory):
+        try:
+            return open_columns(directory)
+        except (OSError, ValueError):
+            shutil.rmtree(directory, ignore_errors=True)
+    columns = read_columns(file_name)
+    if os.path.isdir(cache_dir):
+        for entry in os.listdir(cache_dir):
+            if entry.startswith(path_key + '-'):
+                shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+    save_columns(columns, directory)
+    return columns
+
+
+def read_columns(file_name):
+    """
+    Считывает csv файл сразу в столбцы, не создавая словарь и объект Vacancy для каждой строки.
+    Args:
+        file_name (str): Название файла
+    Returns:
+        Columns: Данные вакансий по столбцам
+    """
+    with open(file_name, encoding='utf_8_sig', newline='') as file:
+        reader = csv.reader(file)
+        return parse_columns(reader, next(reader, []))
+
+
+def parse_columns(rows, title):
+    """
+    Раскладывает строки csv по столбцам.
+    Пропускает те же строки, что и DataSet.csv_reader: с пустыми полями или неполные.
+    Args:
+        rows (iterable): Строки csv в виде списков
+        title (list): Заголовок csv файла
+    Returns:
+        Columns: Данные вакансий по столбцам
+    """
+    import numpy as np
+
+    salary_from, salary_to = array.array('d'), array.array('d')
+    year = array.array('h')
+    name_code, area_code = array.array('i'), array.array('i')
+    currency_code = array.array('b')
+    names, area_names, currencies = {}, {}, {}
+
+    title_length = len(title)
+    if title_length:
+        i_name, i_from, i_to, i_currency, i_area, i_published = (
+            title.index(key) for key in
+            ('name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at'))
+    for row in rows:
+        if len(row) != title_length or '' in row:
+            continue
+        salary_from.append(int(float(row[i_from])))
+        salary_to.append(int(float(row[i_to])))
+        year.append(int(row[i_published][:4]))
+        name_code.append(names.setdefault(row[i_name], len(names)))
+        area_code.append(area_names.setdefault(row[i_area], len(area_names)))
+        currency_code.append(currencies.setdefault(row[i_currency], len(currencies)))
+
+    return Columns(np.frombuffer(salary_from, dtype=np.float64), np.frombuffer(salary_to, dtype=np.float64),
+                   np.frombuffer(year, dtype=np.int16), np.frombuffer(name_code, dtype=np.intc),
+                   np.frombuffer(area_code, dtype=np.intc), np.frombuffer(currency_code, dtype=np.int8),
+                   list(names), list(area_names), list(currencies))
+
+
+def merge_aggregates(aggregates):
+    """
+    Объединяет частичные агрегаты (например, посчитанные по разным частям файла) в один.
+    Порядок ключей - порядок первого появления, если частичные агрегаты переданы в порядке файла.
+    Args:
+        aggregates (iterable): Кортежи вида Columns.aggregate
+    Returns:
+        tuple: salary, salary_of_vacancy_name, salary_city, vacancies_count
+    """
+    salary, salary_of_vacancy_name, salary_city, vacancies_count = {}, {}, {}, 0
+    for part in aggregates:
+        for target, source in zip((salary, salary_of_vacancy_name, salary_city), part):
+            for key, (total, count) in source.items():
+                if key in target:
+                    target[key][0] += total
+                    target[key][1] += count
+                else:
+                    target[key] = [total, count]
+        vacancies_count += part[3]
+    return salary, salary_of_vacancy_name, salary_city, vacancies_count
@@ -0,0 +1,234 @@
+class FilterSyntaxError(ValueError):
+    """
+    Ошибка в выражении фильтрации, текст ошибки выводится пользователю.
+    """
+
+
+class Condition:
+    """
+    Условие на один параметр фильтрации.
+    Attributes:
+        key (str): Параметр фильтрации
+        values (list): Значения: одно для "Ключ: значение", несколько для "Ключ IN (...)", None для диапазона
+        low: Нижняя граница диапазона или None
+        high: Верхняя граница диапазона или None
+        text (str): Условие в том виде, в котором его ввели
+    """
+    def __init__(self, key, values=None, low=None, high=None, text=''):
+        self.key = key
+        self.values = values
+        self.low = low
+        self.high = high
+        self.text = text or '{0}: {1}'.format(key, values[0])
+
+    @property
+    def is_range(self):
+        return self.values is None
+
+    def __str__(self):
+        return self.text
+
+
+class And:
+    """
+    Все условия выполняются.
+    Attributes:
+        children (list): Условия
+    """
+    operator = 'AND'
+
+    def __init__(self, children):
+        self.children = children
+
+    def __str__(self):
+        return ' {0} '.format(self.operator).join(
+            '({0})'.format(child) if isinstance(child, (And, Or)) else str(child) for child in self.children)
+
+
+class Or(And):
+    """
+    Выполняется хотя бы одно из условий.
+    Attributes:
+        children (list): Условия
+    """
+    operator = 'OR'
+
+
+class Not:
+    """
+    Условие не выполняется.
+    Attributes:
+        child: Условие
+    """
+    def __init__(self, child):
+        self.child = child
+
+    def __str__(self):
+        return 'NOT ({0})'.format(self.child) if isinstance(self.child, (And, Or)) else 'NOT {0}'.format(self.child)
+
+
+class Parser:
+    """
+    Разбирает выражение фильтрации методом рекурсивного спуска.
+    Грамматика (NOT связывает сильнее AND, AND сильнее OR):
+        выражение := слагаемое (OR слагаемое)*
+        слагаемое := множитель (AND множитель)*
+        множитель := NOT множитель | (выражение) | условие
+        условие := Ключ: значение | Ключ: от..до | Ключ IN (значение, значение, ...)
+    Значение продолжается до " AND ", " OR " или закрывающей скобки группы. Значение, в котором есть эти слова
+    или скобки, записывается в двойных кавычках. Диапазон допускается только для параметров из converters,
+    любую из границ можно опустить.
+    Attributes:
+        text (str): Выражение
+        keys: Допустимые параметры фильтрации
+        converters (dict): Параметр -> функция, переводящая границу диапазона в значение для сравнения
+        position (int): Текущая позиция разбора
+    """
+    format_error = 'Формат ввода некорректен'
+    key_error = 'Параметр поиска некорректен'
+
+    def __init__(self, text, keys, converters):
+        self.text = text
+        self.keys = keys
+        self.converters = converters
+        self.position = 0
+
+    def parse(self):
+        """
+        Разбирает выражение целиком.
+        Returns:
+            Condition, And, Or или Not: Дерево выражения
+        """
+        node = self.expression(0)
+        self.skip_spaces()
+        if self.position != len(self.text):
+            raise FilterSyntaxError(self.format_error)
+        return node
+
+    def skip_spaces(self):
+        while self.position < len(self.text) and self.text[self.position] == ' ':
+            self.position += 1
+
+    def keyword(self, word):
+        """
+        Пропускает ключевое слово, если оно стоит в текущей позиции.
+        Args:
+            word (str): AND, OR или NOT
+        Returns:
+            bool: Было ли ключевое слово
+        """
+        start = self.position
+        self.skip_spaces()
+        end = self.position + len(word)
+        if self.text.startswith(word, self.position) and self.text[end:end + 1] in (' ', '('):
+            self.position = end
+            return True
+        self.position = start
+        return False
+
+    def expression(self, depth):
+        children = [self.term(depth)]
+        while self.keyword('OR'):
+            children.append(self.term(depth))
+        return children[0] if len(children) == 1 else Or(children)
+
+    def term(self, depth):
+        children = [self.factor(depth)]
+        while self.keyword('AND'):
+            children.append(self.factor(depth))
+        return children[0] if len(children) == 1 else And(children)
+
+    def factor(self, depth):
+        if self.keyword('NOT'):
+            return Not(self.factor(depth))
+        self.skip_spaces()
+        if self.text.startswith('(', self.position):
+            self.position += 1
+            node = self.expression(depth + 1)
+            self.skip_spaces()
+            if not self.text.startswith(')', self.position):
+                raise FilterSyntaxError(self.format_error)
+            self.position += 1
+            return node
+        return self.condition(depth)
+
+    def condition(self, depth):
+        """
+        Разбирает условие на один параметр.
+        Args:
+            depth (int): Глубина вложенности скобок
+        Returns:
+            Condition: Условие
+        """
+        start = self.position
+        rest = self.text[start:]
+        colon, inside = rest.find(': '), rest.find(' IN (')
+        if inside != -1 and (colon == -1 or inside < colon):
+            key = rest[:inside]
+            self.check_key(key)
+            self.position += inside + len(' IN (')
+            values = [self.value((', ', ')'))]
+            while self.text.startswith(', ', self.position):
+                self.position += 2
+                values.append(self.value((', ', ')')))
+            if not self.text.startswith(')', self.position):
+                raise FilterSyntaxError(self.format_error)
+            self.position += 1
+            return Condition(key, values, text=self.text[start:self.position])
+        if colon == -1:
+            raise FilterSyntaxError(self.format_error)
+        key = rest[:colon]
+        self.check_key(key)
+        self.position += colon + 2
+        value = self.value((' AND ', ' OR ') + ((')',) if depth else ()))
+        text = self.text[start:self.position].rstrip()
+        if key in self.converters and '..' in value:
+            low, high = value.split('..', 1)
+            try:
+                low = self.converters[key](low) if low else None
+                high = self.converters[key](high) if high else None
+            except ValueError:
+                raise FilterSyntaxError(self.format_error)
+            return Condition(key, low=low, high=high, text=text)
+        return Condition(key, [value], text=text)
+
+    def check_key(self, key):
+        if key not in self.keys:
+            raise FilterSyntaxError(self.key_error)
+
+    def value(self, stops):
+        """
+        Читает значение условия: в кавычках или до ближайшего из разделителей.
+        Args:
+            stops (tuple): Разделители, на которых значение заканчивается
+        Returns:
+            str: Значение
+        """
+        if self.text.startswith('"', self.position):
+            end = self.text.find('"', self.position + 1)
+            if end == -1:
+                raise FilterSyntaxError(self.format_error)
+            value = self.text[self.position + 1:end]
+            self.position = end + 1
+            return value
+        ends = [end for end in (self.text.find(stop, self.position) for stop in stops) if end != -1]
+        end = min(ends, default=len(self.text))
+        value = self.text[self.position:end]
+        if value.endswith((' AND', ' OR')):
+            raise FilterSyntaxError(self.format_error)
+        self.position = end
+        return value.rstrip() if self.text.startswith(')', end) else value
+
+
+def parse(text, keys, converters=None):
+    """
+    Разбирает выражение фильтрации, например
+    'Название региона IN (Москва, Казань) AND Оклад: 50000..100000 AND NOT Премиум-вакансия: Да'.
+    Args:
+        text (str): Выражение
+        keys: Допустимые параметры фильтрации
+        converters (dict): Параметр -> функция для границ диапазона, только для этих параметров допустимы диапазоны
+    Returns:
+        Condition, And, Or или Not: Дерево выражения
+    """
+    return Parser(text, keys, converters or {}).parse()
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import tempfile
+
+import columnar
+
+CACHE_DIR = '.split_cache'
+COLUMNS_FILE = 'frame.json'
+
+
+def save_frame(dataframe, directory):
+    """
+    Сохраняет таблицу pandas в каталог по одному .npy файлу на столбец, чтобы их можно было отобразить в память.
+    Строковый столбец сохраняется одним буфером UTF-8 со смещениями начала каждой строки, поэтому одно длинное
+    описание не раздувает весь столбец, пропуски в нем - отдельной маской. Столбцы с объектами других типов
+    не сохраняются, чтобы после загрузки они не превратились в строки.
+    Каталог заменяется целиком, поэтому читатели никогда не видят наполовину записанный кэш.
+    Args:
+        dataframe (pd.DataFrame): Таблица
+        directory (str): Каталог для сохранения
+    Raises:
+        ValueError: В таблице есть столбец, который нельзя сохранить без потери типов
+    """
+    import numpy as np
+    import pandas as pd
+
+    parent = os.path.dirname(directory) or '.'
+    os.makedirs(parent, exist_ok=True)
+    temp = tempfile.mkdtemp(dir=parent)
+    try:
+        kinds = []
+        for number, name in enumerate(dataframe.columns):
+            values = dataframe[name]
+            array = values.to_numpy()
+            path = os.path.join(temp, '{0}.npy'.format(number))
+            if array.dtype != object:
+                np.save(path, array, allow_pickle=False)
+                kinds.append('array')
+                continue
+            if pd.api.types.infer_dtype(array, skipna=True) not in ('string', 'empty'):
+                raise ValueError('столбец {0} содержит не только строки'.format(name))
+            missing = values.isna().to_numpy()
+            strings = values.where(~missing, '').tolist()
+            offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+            np.cumsum([len(string) for string in strings], out=offsets[1:])
+            buffer = ''.join(strings).encode('utf-8', 'surrogatepass')
+            np.save(path, np.frombuffer(buffer, dtype=np.uint8), allow_pickle=False)
+            np.save(os.path.join(temp, '{0}.offsets.npy'.format(number)), offsets, allow_pickle=False)
+            np.save(os.path.join(temp, '{0}.missing.npy'.format(number)), missing, allow_pickle=False)
+            kinds.append('string')
+        with open(os.path.join(temp, COLUMNS_FILE), 'w', encoding='utf-8') as file:
+            json.dump({'names': [str(name) for name in dataframe.columns], 'kinds': kinds}, file, ensure_ascii=False)
+    except ValueError:
+        shutil.rmtree(temp, ignore_errors=True)
+        raise
+    try:
+        os.replace(temp, directory)
+    except OSError:
+        shutil.rmtree(temp, ignore_errors=True)
+
+
+def open_frame(directory):
+    """
+    Открывает сохраненную таблицу, числовые столбцы отображаются в память без чтения целиком.
+    Args:
+        directory (str): Каталог с сохраненными столбцами
+    Returns:
+        pd.DataFrame: Таблица
+    """
+    import numpy as np
+    import pandas as pd
+
+    with open(os.path.join(directory, COLUMNS_FILE), encoding='utf-8') as file:
+        layout = json.load(file)
+    data = {}
+    for number, (name, kind) in enumerate(zip(layout['names'], layout['kinds'])):
+        values = np.load(os.path.join(directory, '{0}.npy'.format(number)), mmap_mode='r')
+        if kind == 'string':
+            text = values.tobytes().decode('utf-8', 'surrogatepass')
+            offsets = np.load(os.path.join(directory, '{0}.offsets.npy'.format(number))).tolist()
+            strings = np.empty(len(offsets) - 1, dtype=object)
+            strings[:] = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+            strings[np.load(os.path.join(directory, '{0}.missing.npy'.format(number)))] = np.nan
+            values = strings
+        data[name] = values
+    return pd.DataFrame(data, columns=layout['names'], copy=False)
+
+
+def load_frame(file_name, read, cache_dir=CACHE_DIR):
+    """
+    Возвращает таблицу из кэша, если файл не менялся (см. columnar.file_fingerprint), иначе читает файл
+    и кэширует результат. Устаревшие записи кэша для того же файла удаляются. Таблица, которую нельзя
+    сохранить без потери типов (см. save_frame), не кэшируется и читается из файла каждый раз.
+    Args:
+        file_name (str): Название файла
+        read (function): Функция, которая читает файл в таблицу pandas
+        cache_dir (str): Каталог кэша
+    Returns:
+        tuple: Таблица и отпечаток файла
+    """
+    path_key, content_key = columnar.file_fingerprint(file_name)
+    fingerprint = '{0}-{1}'.format(path_key, content_key)
+    directory = os.path.join(cache_dir, fingerprint)
+    if os.path.isdir(directory):
+        try:
+            return open_frame(directory), fingerprint
+        except (OSError, ValueError):
+            shutil.rmtree(directory, ignore_errors=True)
+    dataframe = read(file_name)
+    if os.path.isdir(cache_dir):
+        for entry in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, entry)
+            if not entry.startswith(path_key + '-'):
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+    try:
+        save_frame(dataframe, directory)
+    except ValueError:
+        pass
+    return dataframe, fingerprint
@@ -0,0 +1,174 @@
+import csv
+import hashlib
+import io
+import json
+import os
+
+import columnar
+import parallel
+
+CHUNK_SIZE = 64 << 20
+CHECK_SIZE = 64 << 10
+
+
+def last_record_end(data):
+    """
+    Находит конец последней полной записи csv в блоке, который начинается с начала записи.
+    Args:
+        data (bytes): Блок файла
+    Returns:
+        int: Длина части блока, состоящей только из полных записей
+    """
+    newline = data.rfind(b'\n')
+    while newline != -1 and data.count(b'"', 0, newline) % 2:
+        newline = data.rfind(b'\n', 0, newline)
+    return newline + 1
+
+
+def checksum(file, start, end):
+    """
+    Считает хеш части файла.
+    Args:
+        file (BinaryIO): Файл, открытый в бинарном режиме
+        start (int): Начало части в байтах
+        end (int): Конец части в байтах
+    Returns:
+        str: Хеш части файла
+    """
+    file.seek(start)
+    return hashlib.blake2b(file.read(end - start), digest_size=16).hexdigest()
+
+
+class IncrementalStatistic:
+    """
+    Хранит суммы и количества для статистики по файлу, который только дописывается в конец.
+    Состояние сохраняется в json файл вместе со смещением в байтах и количеством обработанных вакансий,
+    следующий запуск разбирает только дописанные записи. Если начало или конец уже обработанной части
+    файла изменились, статистика пересчитывается заново.
+    Учитываются только записи, которые заканчиваются переводом строки: незаконченная последняя запись
+    может еще дописываться и будет обработана при следующем запуске.
+    Attributes:
+        file_name (str): Название файла
+        vacancy_name (str): Название вакансии
+        state_file (str): Файл с сохраненным состоянием
+        state (dict): Текущее состояние
+    """
+    def __init__(self, file_name, vacancy_name, state_file):
+        """
+        Инициализирует объект IncrementalStatistic.
+        Args:
+            file_name (str): Название файла
+            vacancy_name (str): Название вакансии
+            state_file (str): Файл с сохраненным состоянием
+        """
+        self.file_name = file_name
+        self.vacancy_name = vacancy_name
+        self.state_file = state_file
+        self.state = None
+
+    def load_state(self, file):
+        """
+        Загружает сохраненное состояние, если оно относится к тому же файлу и профессии и обработанная
+        часть файла не изменилась.
+        Args:
+            file (BinaryIO): Файл, открытый в бинарном режиме
+        Returns:
+            dict: Состояние или None, если статистику нужно считать заново
+        """
+        if not os.path.exists(self.state_file):
+            return None
+        with open(self.state_file, encoding='utf-8') as state_file:
+            state = json.load(state_file)
+        offset = state['offset']
+        if (state['file'] != os.path.abspath(self.file_name) or state['vacancy_name'] != self.vacancy_name
+                or os.path.getsize(self.file_name) < offset
+                or state['head_checksum'] != checksum(file, 0, min(CHECK_SIZE, offset))
+                or state['tail_checksum'] != checksum(file, max(offset - CHECK_SIZE, 0), offset)):
+            return None
+        return state
+
+    def save_state(self, file, title, offset, aggregates):
+        """
+        Сохраняет состояние в json файл.
+        Args:
+            file (BinaryIO): Файл, открытый в бинарном режиме
+            title (list): Заголовок csv файла
+            offset (int): Смещение конца обработанной части в байтах
+            aggregates (tuple): salary, salary_of_vacancy_name, salary_city, vacancies_count
+        """
+        salary, salary_of_vacancy_name, salary_city, vacancies_count = aggregates
+        self.state = {
+            'file': os.path.abspath(self.file_name),
+            'vacancy_name': self.vacancy_name,
+            'title': title,
+            'offset': offset,
+            'rows': vacancies_count,
+            'head_checksum': checksum(file, 0, min(CHECK_SIZE, offset)),
+            'tail_checksum': checksum(file, max(offset - CHECK_SIZE, 0), offset),
+            'salary': [[key, total, count] for key, (total, count) in salary.items()],
+            'salary_of_vacancy_name': [[key, total, count] for key, (total, count) in salary_of_vacancy_name.items()],
+            'salary_city': [[key, total, count] for key, (total, count) in salary_city.items()],
+        }
+        temp = self.state_file + '.tmp'
+        with open(temp, 'w', encoding='utf-8') as state_file:
+            json.dump(self.state, state_file, ensure_ascii=False)
+        os.replace(temp, self.state_file)
+
+    @staticmethod
+    def state_aggregates(state):
+        """
+        Превращает сохраненное состояние обратно в суммы и количества.
+        Args:
+            state (dict): Состояние
+        Returns:
+            tuple: salary, salary_of_vacancy_name, salary_city, vacancies_count
+        """
+        return tuple({key: [total, count] for key, total, count in state[name]}
+                     for name in ('salary', 'salary_of_vacancy_name', 'salary_city')) + (state['rows'],)
+
+    def digest(self):
+        """
+        Считает хеш состояния после update без пути к файлу: он определяется обработанными записями
+        и статистикой по ним, поэтому подходит для ключа кэша отчетов без чтения всего файла.
+        Returns:
+            str: Хеш состояния
+        """
+        state = {key: value for key, value in self.state.items() if key != 'file'}
+        data = json.dumps(state, ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+    def update(self):
+        """
+        Дообрабатывает дописанные записи и сохраняет новое состояние.
+        Returns:
+            tuple: salary, salary_of_vacancy_name, salary_city, vacancies_count
+        """
+        with open(self.file_name, 'rb') as file:
+            state = self.load_state(file)
+            if state is None:
+                offset = parallel.find_record_starts(file, [0])[0]
+                file.seek(0)
+                title = next(csv.reader(io.StringIO(file.read(offset).decode('utf_8_sig'))), [])
+                parts = []
+            else:
+                offset, title = state['offset'], state['title']
+                parts = [self.state_aggregates(state)]
+
+            file.seek(offset)
+            rest = b''
+            while True:
+                block = file.read(CHUNK_SIZE)
+                if not block:
+                    break
+                data = rest + block
+                end = last_record_end(data)
+                rest = data[end:]
+                if end:
+                    text = data[:end].decode('utf-8')
+                    parts.append(columnar.parse_columns(csv.reader(io.StringIO(text, newline='')), title)
+                                 .aggregate(self.vacancy_name))
+                    offset += end
+
+            aggregates = columnar.merge_aggregates(parts)
+            self.save_state(file, title, offset, aggregates)
+        return aggregates
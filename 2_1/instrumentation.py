@@ -0,0 +1,192 @@
+import atexit
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ENVIRONMENT_VARIABLE = 'VACANCY_TRACE'
+
+
+class Stage:
+    """
+    Замер одного этапа отчета.
+    Attributes:
+        name (str): Название этапа
+        rows (int): Количество обработанных строк, если этап их считает
+        wall_seconds (float): Время выполнения
+        cpu_seconds (float): Процессорное время
+        peak_memory_mb (float): Пик памяти, выделенной Python за время этапа (tracemalloc)
+        max_rss_mb (float): Максимальный RSS процесса на момент окончания этапа
+        depth (int): Вложенность этапа, 0 - этап верхнего уровня
+        pid (int): Процесс, в котором выполнялся этап
+    """
+    def __init__(self, name, rows=None, depth=0):
+        self.name = name
+        self.rows = rows
+        self.depth = depth
+        self.pid = os.getpid()
+        self.wall_seconds = None
+        self.cpu_seconds = None
+        self.peak_memory_mb = None
+        self.max_rss_mb = None
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+class Trace:
+    """
+    Собирает замеры этапов и сохраняет их в json файл.
+    Пока трассировка не включена, stage ничего не измеряет, поэтому вызовы можно оставлять в коде всегда.
+    В рабочих процессах трассировка включается только на время collect, а замеры возвращаются родителю,
+    который добавляет их к своим через merge.
+    Attributes:
+        file_name (str): Файл для сохранения трассировки, None - трассировка выключена
+        collecting (bool): Замеры собираются для родительского процесса (см. collect)
+        stages (list): Замеры этапов
+        active (list): Незавершенные этапы от внешнего к вложенному, для каждого - [этап, память в начале,
+            наибольший пик до последнего tracemalloc.reset_peak]
+    """
+    def __init__(self):
+        self.file_name = None
+        self.collecting = False
+        self.stages = []
+        self.active = []
+
+    @property
+    def enabled(self):
+        return self.file_name is not None or self.collecting
+
+    def enable(self, file_name):
+        """
+        Включает трассировку, результат будет записан в файл при завершении программы.
+        Args:
+            file_name (str): Файл для сохранения трассировки
+        """
+        if not self.enabled:
+            atexit.register(self.save)
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+        self.file_name = file_name
+
+    @contextmanager
+    def collect(self):
+        """
+        Включает трассировку в рабочем процессе на время блока, не сохраняя ее в файл.
+        Yields:
+            list: Замеры этапов блока (словари Stage.to_dict), список заполняется при выходе из блока
+        """
+        records = []
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        collecting, self.collecting = self.collecting, True
+        active, self.active = self.active, []
+        first = len(self.stages)
+        try:
+            yield records
+        finally:
+            records.extend(stage.to_dict() for stage in self.stages[first:])
+            del self.stages[first:]
+            self.collecting, self.active = collecting, active
+            if started:
+                tracemalloc.stop()
+
+    def merge(self, records):
+        """
+        Добавляет замеры этапов из рабочего процесса как вложенные в текущий этап.
+        Args:
+            records (list): Замеры этапов из collect
+        """
+        if not self.enabled:
+            return
+        for record in records:
+            stage = Stage(record['name'])
+            stage.__dict__.update(record)
+            stage.depth += len(self.active)
+            self.stages.append(stage)
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Измеряет время, процессорное время и пик памяти блока кода.
+        Количество строк можно задать сразу или записать в stage.rows внутри блока.
+        Вложенный этап сбрасывает пик tracemalloc, поэтому пик до сброса запоминается у внешнего этапа
+        и учитывается в его peak_memory_mb.
+        Args:
+            name (str): Название этапа
+            rows (int): Количество обработанных строк
+        Yields:
+            Stage: Замер этапа
+        """
+        stage = Stage(name, rows, len(self.active))
+        if not self.enabled:
+            yield stage
+            return
+        if self.active:
+            outer = self.active[-1]
+            outer[2] = max(outer[2], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        entry = [stage, tracemalloc.get_traced_memory()[0], 0]
+        self.active.append(entry)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            stage.wall_seconds = round(time.perf_counter() - wall, 6)
+            stage.cpu_seconds = round(time.process_time() - cpu, 6)
+            self.active.remove(entry)
+            peak = max(entry[2], tracemalloc.get_traced_memory()[1])
+            if self.active:
+                outer = self.active[-1]
+                outer[2] = max(outer[2], peak)
+            stage.peak_memory_mb = round((peak - entry[1]) / 2 ** 20, 3)
+            if resource is not None:
+                max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                stage.max_rss_mb = round(max_rss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 3)
+            self.stages.append(stage)
+
+    def measure(self, name):
+        """
+        Декоратор, который измеряет каждый вызов функции как этап.
+        Args:
+            name (str): Название этапа
+        Returns:
+            function: Декоратор
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def save(self):
+        """
+        Записывает замеры этапов в json файл. Общее время - сумма только этапов верхнего уровня,
+        время вложенных этапов уже входит в них.
+        """
+        if not self.enabled:
+            return
+        total = sum(stage.wall_seconds for stage in self.stages if stage.depth == 0)
+        with open(self.file_name, 'w', encoding='utf-8') as file:
+            json.dump({'pid': os.getpid(), 'argv': sys.argv, 'total_wall_seconds': round(total, 6),
+                       'stages': [stage.to_dict() for stage in self.stages]},
+                      file, ensure_ascii=False, indent=2)
+
+
+trace = Trace()
+stage = trace.stage
+measure = trace.measure
+if os.environ.get(ENVIRONMENT_VARIABLE) and multiprocessing.parent_process() is None:
+    trace.enable(os.environ[ENVIRONMENT_VARIABLE])
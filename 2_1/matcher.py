@@ -0,0 +1,60 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Автомат Ахо-Корасик: находит вхождения сразу всех образцов за один проход по строке.
+    Attributes:
+        patterns (list): Образцы для поиска
+        transitions (list): Переходы автомата, словарь символ -> состояние для каждого состояния
+        fail (list): Суффиксные ссылки для каждого состояния
+        output (list): Номера образцов, которые заканчиваются в каждом состоянии
+    """
+    def __init__(self, patterns):
+        """
+        Строит автомат по образцам.
+        Args:
+            patterns (list): Образцы для поиска
+        """
+        self.patterns = list(patterns)
+        self.transitions = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            self.output[state].append(index)
+
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.transitions[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.transitions[fail].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def search(self, text):
+        """
+        Находит образцы, которые встречаются в строке.
+        Args:
+            text (str): Строка для поиска
+        Returns:
+            set: Номера найденных образцов
+        """
+        found = set(self.output[0])
+        state = 0
+        for char in text:
+            while state and char not in self.transitions[state]:
+                state = self.fail[state]
+            state = self.transitions[state].get(char, 0)
+            found.update(self.output[state])
+        return found
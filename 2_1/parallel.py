@@ -0,0 +1,111 @@
+import csv
+import io
+import os
+from concurrent import futures
+
+import columnar
+
+BLOCK_SIZE = 1 << 20
+
+
+def find_record_starts(file, offsets):
+    """
+    Сдвигает каждое смещение вперед до начала ближайшей записи csv.
+    Перевод строки считается границей записи, только если до него в файле четное количество кавычек,
+    поэтому переводы строк внутри полей в кавычках границей не считаются.
+    Args:
+        file (BinaryIO): Файл, открытый в бинарном режиме
+        offsets (list): Возрастающие смещения в байтах
+    Returns:
+        list: Смещения начала записей, по одному на каждое переданное смещение
+    """
+    file.seek(0)
+    position, quotes, starts = 0, 0, []
+    for offset in offsets:
+        while position < offset:
+            block = file.read(min(BLOCK_SIZE, offset - position))
+            if not block:
+                break
+            quotes += block.count(b'"')
+            position += len(block)
+        start = None
+        while start is None:
+            block = file.read(BLOCK_SIZE)
+            if not block:
+                start = position
+                break
+            index = 0
+            while True:
+                newline = block.find(b'\n', index)
+                if newline == -1:
+                    quotes += block.count(b'"', index)
+                    position += len(block)
+                    break
+                quotes += block.count(b'"', index, newline)
+                index = newline + 1
+                if quotes % 2 == 0:
+                    start = position = position + index
+                    file.seek(position)
+                    break
+        starts.append(start)
+    return starts
+
+
+def split_ranges(file_name, parts):
+    """
+    Делит файл на диапазоны байт, выровненные по границам записей.
+    Args:
+        file_name (str): Название файла
+        parts (int): Желаемое количество диапазонов
+    Returns:
+        tuple: Заголовок csv файла и список пар (начало, конец) для данных без заголовка
+    """
+    size = os.path.getsize(file_name)
+    with open(file_name, 'rb') as file:
+        data_start = find_record_starts(file, [0])[0]
+        file.seek(0)
+        header = file.read(data_start).decode('utf_8_sig')
+        step = max((size - data_start) // parts, 1)
+        offsets = [data_start + step * i for i in range(1, parts)]
+        starts = [data_start] + find_record_starts(file, offsets) + [size]
+    title = next(csv.reader(io.StringIO(header)), [])
+    ranges = [(start, end) for start, end in zip(starts, starts[1:]) if start < end]
+    return title, ranges
+
+
+def aggregate_range(file_name, start, end, title, vacancy_name):
+    """
+    Разбирает один диапазон файла и считает по нему частичный агрегат.
+    Args:
+        file_name (str): Название файла
+        start (int): Начало диапазона в байтах
+        end (int): Конец диапазона в байтах
+        title (list): Заголовок csv файла
+        vacancy_name (str): Название профессии
+    Returns:
+        tuple: salary, salary_of_vacancy_name, salary_city, vacancies_count
+    """
+    with open(file_name, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    return columnar.parse_columns(csv.reader(io.StringIO(text, newline='')), title).aggregate(vacancy_name)
+
+
+def aggregate_parallel(file_name, vacancy_name, workers):
+    """
+    Считает агрегаты по файлу в пуле процессов: каждый процесс обрабатывает свои диапазоны байт,
+    а частичные результаты объединяются в порядке файла.
+    Диапазонов в несколько раз больше, чем процессов, чтобы нагрузка распределялась равномернее.
+    Args:
+        file_name (str): Название файла
+        vacancy_name (str): Название профессии
+        workers (int): Количество процессов
+    Returns:
+        tuple: salary, salary_of_vacancy_name, salary_city, vacancies_count
+    """
+    title, ranges = split_ranges(file_name, workers * 4)
+    count = len(ranges)
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = executor.map(aggregate_range, [file_name] * count, [start for start, _ in ranges],
+                             [end for _, end in ranges], [title] * count, [vacancy_name] * count)
+        return columnar.merge_aggregates(parts)
@@ -1,12 +1,16 @@
+import argparse
+import base64
+import contextlib
 import csv
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Border, Side
-from jinja2 import Environment, FileSystemLoader
-import pathlib
-import pdfkit
-import matplotlib.pyplot as plt
-import numpy as np
+import functools
+import io
+from concurrent import futures
+import os
+import columnar
+import incremental
+import instrumentation
+import parallel
+import report_cache
 
 
 class Vacancy:
@@ -75,30 +79,31 @@ class DataSet:
     @staticmethod
     def average_for_salary(dict):
         """
-        Находит среднюю зарплату в словаре.
+        Находит среднюю зарплату в словаре по накопленным сумме и количеству.
         Args:
-            dict (dict): словарь со средними зарплатами
+            dict (dict): словарь с парами [сумма зарплат, количество вакансий]
         Returns:
              dict: словарь со средними зарплатами
         """
         answer = {}
-        for key, values in dict.items():
-            answer[key] = int(sum(values) / len(values))
+        for key, (total, count) in dict.items():
+            answer[key] = int(total / count)
         return answer
 
     @staticmethod
     def augmentation(vacancy, amount, dict):
         """
-        Добавляет данные к словарю
+        Добавляет данные к словарю, храня для каждого ключа только сумму и количество.
         Args:
             vacancy (int): год вакансии
-            amount (list): средняя зарплата
-            dict (dict): словарь с зарплатами
+            amount (float): средняя зарплата
+            dict (dict): словарь с парами [сумма зарплат, количество вакансий]
         """
         if vacancy in dict:
-            dict[vacancy] += amount
+            dict[vacancy][0] += amount
+            dict[vacancy][1] += 1
         else:
-            dict[vacancy] = amount
+            dict[vacancy] = [amount, 1]
 
     def get_statistic(self):
         """
@@ -110,25 +115,39 @@ class DataSet:
 
         for vacancy_dict in self.csv_reader():
             vacancy = Vacancy(vacancy_dict)
-            self.augmentation(vacancy.year, [vacancy.salary_average], salary)
+            self.augmentation(vacancy.year, vacancy.salary_average, salary)
             if vacancy.name.find(self.vacancy_name) != -1:
-                self.augmentation(vacancy.year, [vacancy.salary_average], salary_of_vacancy_name)
-            self.augmentation(vacancy.area_name, [vacancy.salary_average], salary_city)
+                self.augmentation(vacancy.year, vacancy.salary_average, salary_of_vacancy_name)
+            self.augmentation(vacancy.area_name, vacancy.salary_average, salary_city)
             vacancies_count += 1
 
-        number_vacancies = dict([(key, len(value)) for key, value in salary.items()])
-        number_vacancies_by_name = dict([(key, len(value)) for key, value in salary_of_vacancy_name.items()])
+        return self.build_statistic(salary, salary_of_vacancy_name, salary_city, vacancies_count)
+
+    @classmethod
+    def build_statistic(cls, salary, salary_of_vacancy_name, salary_city, vacancies_count):
+        """
+        Превращает накопленные суммы и количества в итоговые словари статистики.
+        Args:
+            salary (dict): [сумма, количество] зарплат по годам
+            salary_of_vacancy_name (dict): [сумма, количество] зарплат по годам для выбранной профессии
+            salary_city (dict): [сумма, количество] зарплат по городам
+            vacancies_count (int): Общее количество вакансий
+        Returns:
+            tuple: Солержит в себе словари с данными статистик
+        """
+        number_vacancies = dict([(key, value[1]) for key, value in salary.items()])
+        number_vacancies_by_name = dict([(key, value[1]) for key, value in salary_of_vacancy_name.items()])
 
         if not salary_of_vacancy_name:
-            salary_of_vacancy_name = dict([(key, [0]) for key, value in salary.items()])
+            salary_of_vacancy_name = dict([(key, [0, 1]) for key, value in salary.items()])
             number_vacancies_by_name = dict([(key, 0) for key, value in number_vacancies.items()])
 
-        value = self.average_for_salary(salary)
-        value2 = self.average_for_salary(salary_of_vacancy_name)
-        value3 = self.average_for_salary(salary_city)
+        value = cls.average_for_salary(salary)
+        value2 = cls.average_for_salary(salary_of_vacancy_name)
+        value3 = cls.average_for_salary(salary_city)
         value4 = {}
-        for year, salaries in salary_city.items():
-            value4[year] = round(len(salaries) / vacancies_count, 4)
+        for city, (_, count) in salary_city.items():
+            value4[city] = round(count / vacancies_count, 4)
         value4 = list(filter(lambda a: a[-1] >= 0.01, [(key, value) for key, value in value4.items()]))
         value4.sort(key=lambda a: a[-1], reverse=True)
         value5 = value4.copy()
@@ -153,11 +172,178 @@ class DataSet:
         print('Доля вакансий по городам (в порядке убывания): {0}'.format(value6))
 
 
+class ColumnarDataSet(DataSet):
+    """
+    Считывает csv файл сразу в типизированные столбцы (см. columnar.Columns) и считает статистику
+    векторными группировками вместо создания Vacancy для каждой строки.
+    Разобранные столбцы кэшируются на диске (см. columnar.load_columns), повторный запуск по тому же файлу
+    не разбирает csv заново.
+    Attributes:
+        cache_dir (str): Каталог кэша столбцов, None - не использовать кэш
+        columns (Columns): Столбцы после get_statistic
+        mask (np.ndarray): Вакансии выбранной профессии после get_statistic
+    """
+    def __init__(self, file_name, vacancy_name, cache_dir=columnar.CACHE_DIR):
+        """
+        Инициализирует объект ColumnarDataSet.
+        Args:
+            file_name (str): Название файла
+            vacancy_name (str): Название вакансии
+            cache_dir (str): Каталог кэша столбцов, None - не использовать кэш
+        """
+        super().__init__(file_name, vacancy_name)
+        self.cache_dir = cache_dir
+        self.columns = None
+        self.mask = None
+
+    def get_statistic(self):
+        """
+        Формирует данные для статистики по столбцам.
+        Returns:
+            tuple: Солержит в себе словари с данными статистик
+        """
+        with instrumentation.stage('csv parse') as stage:
+            self.columns = columnar.load_columns(self.file_name, self.cache_dir)
+            stage.rows = len(self.columns)
+        with instrumentation.stage('filter', len(self.columns)):
+            self.mask = self.columns.name_mask(self.vacancy_name)
+        with instrumentation.stage('aggregate', len(self.columns)):
+            return self.build_statistic(*self.columns.aggregate(self.vacancy_name, self.mask))
+
+    @classmethod
+    def statistic_for(cls, columns, vacancy_name, region=''):
+        """
+        Считает статистику по уже загруженным столбцам, в том числе только по вакансиям профессии в одном городе.
+        Годы, в которых у профессии нет вакансий, заполняются нулями, чтобы у всех словарей по годам
+        был одинаковый набор лет.
+        Args:
+            columns (Columns): Данные вакансий по столбцам
+            vacancy_name (str): Название профессии
+            region (str): Город, пустая строка - все города
+        Returns:
+            tuple: Словари статистик, как у DataSet.get_statistic
+        """
+        mask = columns.name_mask(vacancy_name)
+        if region:
+            mask &= columns.area_mask(region)
+        value1, value2, value3, value4, value5, value6 = cls.build_statistic(*columns.aggregate(vacancy_name, mask))
+        value3 = {year: value3.get(year, 0) for year in value1}
+        value4 = {year: value4.get(year, 0) for year in value1}
+        return value1, value2, value3, value4, value5, value6
+
+    def matching_vacancies(self):
+        """
+        Выдает вакансии выбранной профессии по одной, для подробного листа отчета.
+        Returns:
+            generator: Строки с данными вакансий (см. columnar.Columns.iter_vacancies)
+        """
+        return self.columns.iter_vacancies(self.mask)
+
+
+class ParallelDataSet(DataSet):
+    """
+    Делит csv файл на диапазоны байт по границам записей и считает статистику в пуле процессов.
+    Attributes:
+        workers (int): Количество процессов
+    """
+    def __init__(self, file_name, vacancy_name, workers):
+        """
+        Инициализирует объект ParallelDataSet.
+        Args:
+            file_name (str): Название файла
+            vacancy_name (str): Название вакансии
+            workers (int): Количество процессов
+        """
+        super().__init__(file_name, vacancy_name)
+        self.workers = workers
+
+    def get_statistic(self):
+        """
+        Формирует данные для статистики, объединяя частичные агрегаты всех процессов.
+        Returns:
+            tuple: Солержит в себе словари с данными статистик
+        """
+        with instrumentation.stage('csv parse + aggregate') as stage:
+            aggregates = parallel.aggregate_parallel(self.file_name, self.vacancy_name, self.workers)
+            stage.rows = aggregates[3]
+        with instrumentation.stage('aggregate', aggregates[3]):
+            return self.build_statistic(*aggregates)
+
+
+class IncrementalDataSet(DataSet):
+    """
+    Считает статистику по дописываемому файлу, разбирая только новые записи (см. incremental.IncrementalStatistic).
+    Attributes:
+        state_file (str): Файл с сохраненным состоянием статистики
+        statistic (IncrementalStatistic): Состояние после get_statistic
+    """
+    def __init__(self, file_name, vacancy_name, state_file):
+        """
+        Инициализирует объект IncrementalDataSet.
+        Args:
+            file_name (str): Название файла
+            vacancy_name (str): Название вакансии
+            state_file (str): Файл с сохраненным состоянием статистики
+        """
+        super().__init__(file_name, vacancy_name)
+        self.state_file = state_file
+        self.statistic = None
+
+    def get_statistic(self):
+        """
+        Формирует данные для статистики, дополняя сохраненное состояние новыми записями.
+        Returns:
+            tuple: Солержит в себе словари с данными статистик
+        """
+        self.statistic = incremental.IncrementalStatistic(self.file_name, self.vacancy_name, self.state_file)
+        with instrumentation.stage('csv parse + aggregate') as stage:
+            aggregates = self.statistic.update()
+            stage.rows = aggregates[3]
+        with instrumentation.stage('aggregate', aggregates[3]):
+            return self.build_statistic(*aggregates)
+
+
+class BatchDataSet(ColumnarDataSet):
+    """
+    Считает статистику сразу для многих профессий за одно чтение файла.
+    Attributes:
+        vacancy_names (list): Названия профессий
+    """
+    def __init__(self, file_name, vacancy_names, cache_dir=columnar.CACHE_DIR):
+        """
+        Инициализирует объект BatchDataSet.
+        Args:
+            file_name (str): Название файла
+            vacancy_names (list): Названия профессий
+            cache_dir (str): Каталог кэша столбцов, None - не использовать кэш
+        """
+        super().__init__(file_name, '', cache_dir)
+        self.vacancy_names = vacancy_names
+
+    def get_statistics(self):
+        """
+        Формирует данные для статистики по каждой профессии.
+        Годы, в которых у профессии нет вакансий, заполняются нулями, как в statistic_for.
+        Returns:
+            dict: Для каждой профессии кортеж со словарями статистик, как у DataSet.get_statistic
+        """
+        columns = columnar.load_columns(self.file_name, self.cache_dir)
+        salary, _, salary_city, vacancies_count = columns.aggregate('')
+        statistics = {}
+        for vacancy_name, salary_of_vacancy_name in columns.aggregate_batch(self.vacancy_names).items():
+            value1, value2, value3, value4, value5, value6 = self.build_statistic(
+                salary, salary_of_vacancy_name, salary_city, vacancies_count)
+            value3 = {year: value3.get(year, 0) for year in value1}
+            value4 = {year: value4.get(year, 0) for year in value1}
+            statistics[vacancy_name] = (value1, value2, value3, value4, value5, value6)
+        return statistics
+
+
 class Report:
     """
     Выводит данные в excel, png, pdf , pdfkit.
     Attributes:
-        workbook (Workbook): Инициализатор книги Excel
+        workbook (Workbook): Книга Excel, создается в generate_excel
         vacancy_name (str): Название вакансии
         value1 (dict): Зарплаты по годам
         value2 (dict): Количество вакансий по годам
@@ -165,8 +351,9 @@ class Report:
         value4 (dict): Количество вакансий по годам для выбранной профессии
         value5 (dict): Зарплаты по городам
         value6 (dict): Доли вакансий по городам
+        output_dir (str): Каталог для файлов отчета
     """
-    def __init__(self, vacancy_name, value1, value2, value3, value4, value5, value6):
+    def __init__(self, vacancy_name, value1, value2, value3, value4, value5, value6, output_dir='.'):
         """
         Иницализация класса для вывода данных.
         Args:
@@ -177,8 +364,9 @@ class Report:
             value4 (dict): Количество вакансий по годам для выбранной профессии
             value5 (dict): Зарплаты по городам
             value6 (dict): Доли вакансий по городам
+            output_dir (str): Каталог для файлов отчета
         """
-        self.workbook = Workbook()
+        self.workbook = None
         self.vacancy_name = vacancy_name
         self.value1 = value1
         self.value2 = value2
@@ -186,13 +374,20 @@ class Report:
         self.value4 = value4
         self.value5 = value5
         self.value6 = value6
+        self.output_dir = output_dir
 
+    @instrumentation.measure('generate_excel')
     def generate_excel(self):
         """
         Генерирует таблички в excel файле на двух страницах используя библиотеку openpyxl.
         Creates:
             Workbook: Файл report.xlsx с двумя страницами и таблицами в них
         """
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, Border, Side
+        from openpyxl.utils import get_column_letter
+
+        self.workbook = Workbook()
         page1 = self.workbook.active
         page1.title = 'Статистика по годам'
         page1.append(['Год', 'Средняя зарплата', 'Средняя зарплата - ' + self.vacancy_name,
@@ -251,14 +446,82 @@ class Report:
             for col in 'ABCDE':
                 page1[col + str(row + 1)].border = Border(left=thin, bottom=thin, right=thin, top=thin)
 
-        self.workbook.save(filename='report.xlsx')
+        self.workbook.save(filename=os.path.join(self.output_dir, 'report.xlsx'))
 
-    def generate_image(self):
+    @instrumentation.measure('generate_excel')
+    def generate_excel_streaming(self, details=()):
         """
-        Генерирует изображение с 4 графиками используя библиотеки matplotlib, numpy.
+        Генерирует те же таблицы, что и generate_excel, в режиме только для записи: строки сразу уходят в файл,
+        а оформление задается общими именованными стилями, поэтому память не растет с количеством строк.
+        Дополнительно выводит лист со всеми вакансиями выбранной профессии, строки которого пишутся без оформления.
+        Args:
+            details (iterable): Строки вакансий для подробного листа
+                (название, нижняя и верхняя граница вилки оклада, валюта, город, год)
         Creates:
-            png: Файл graph.png с 4 графиками
+            Workbook: Файл report.xlsx с тремя страницами и таблицами в них
         """
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, Border, Side, NamedStyle
+        from openpyxl.utils import get_column_letter
+
+        workbook = Workbook(write_only=True)
+        thin = Side(border_style='thin', color='00000000')
+        border = Border(left=thin, bottom=thin, right=thin, top=thin)
+        for style in (NamedStyle('report_header', font=Font(bold=True), border=border),
+                      NamedStyle('report_cell', border=border),
+                      NamedStyle('report_percent', border=border, number_format='0.00%')):
+            workbook.add_named_style(style)
+
+        def styled_row(page, values, styles):
+            cells = []
+            for value, style in zip(values, styles):
+                cell = WriteOnlyCell(page, value)
+                if style:
+                    cell.style = style
+                cells.append(cell)
+            return cells
+
+        page1 = workbook.create_sheet('Статистика по годам')
+        header = ['Год', 'Средняя зарплата', 'Средняя зарплата - ' + self.vacancy_name,
+                  'Количество вакансий', 'Количество вакансий - ' + self.vacancy_name]
+        for i, title in enumerate(header, 1):
+            page1.column_dimensions[get_column_letter(i)].width = len(title) + 3
+        page1.append(styled_row(page1, header, ['report_header'] * 5))
+        for year in self.value1.keys():
+            page1.append(styled_row(page1, [year, self.value1[year], self.value3[year], self.value2[year],
+                                            self.value4[year]], ['report_cell'] * 5))
+
+        page2 = workbook.create_sheet('Статистика по городам')
+        data = [['Город', 'Уровень зарплат', '', 'Город', 'Доля вакансий']]
+        for (city1, value1), (city2, value2) in zip(self.value5.items(), self.value6.items()):
+            data.append([city1, value1, '', city2, value2])
+        for i, column in enumerate(zip(*data), 1):
+            page2.column_dimensions[get_column_letter(i)].width = max(len(str(cell)) for cell in column) + 2
+        page2.append(styled_row(page2, data[0], ['report_header', 'report_header', 'report_header',
+                                                 'report_header', 'report_header']))
+        for row in data[1:]:
+            page2.append(styled_row(page2, row, ['report_cell', 'report_cell', None, 'report_cell', 'report_percent']))
+
+        page3 = workbook.create_sheet(sheet_title('Вакансии - ' + self.vacancy_name))
+        header = ['Название', 'Нижняя граница вилки оклада', 'Верхняя граница вилки оклада', 'Валюта', 'Город', 'Год']
+        for i, width in enumerate((50, 30, 30, 10, 25, 8), 1):
+            page3.column_dimensions[get_column_letter(i)].width = width
+        page3.append(styled_row(page3, header, ['report_header'] * 6))
+        for row in details:
+            page3.append(row)
+
+        workbook.save(filename=os.path.join(self.output_dir, 'report.xlsx'))
+
+    def render_image(self):
+        """
+        Рисует 4 графика используя библиотеки matplotlib, numpy и сохраняет изображение в памяти.
+        Returns:
+            bytes: Изображение в формате png
+        """
+        import matplotlib.pyplot as plt
+        import numpy as np
+
         fig, ((graphic1, graphic2), (graphic3, graphic4)) = plt.subplots(nrows=2, ncols=2)
 
         graphic1.set_title('Уровень зарплат по годам', fontdict={'fontsize': 8})
@@ -290,31 +553,223 @@ class Report:
 
         graphic4.set_title('Доля вакансий по городам', fontdict={'fontsize': 8})
         other = 1 - sum([value for value in self.value6.values()])
-        self.value6 = dict(sorted(self.value6.items(), key=lambda x: x[1]))
-        graphic4.pie(list(self.value6.values()) + [other], labels=list(self.value6.keys()) + ['Другие'],
+        value6 = dict(sorted(self.value6.items(), key=lambda x: x[1]))
+        graphic4.pie(list(value6.values()) + [other], labels=list(value6.keys()) + ['Другие'],
                      textprops={'fontsize': 6})
         plt.tight_layout()
-        plt.savefig('graph.png')
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+        plt.close(fig)
+        return buffer.getvalue()
+
+    @instrumentation.measure('generate_image')
+    def generate_image(self):
+        """
+        Генерирует изображение с 4 графиками.
+        Returns:
+            bytes: Изображение в формате png, чтобы встроить его в pdf без повторного чтения файла
+        Creates:
+            png: Файл graph.png с 4 графиками
+        """
+        image = self.render_image()
+        with open(os.path.join(self.output_dir, 'graph.png'), 'wb') as file:
+            file.write(image)
+        return image
 
-    def generate_pdf(self):
+    @instrumentation.measure('generate_pdf')
+    def generate_pdf(self, image=None):
         """
-        Генерирует pdf файл с 4 графиками и 2 таблицами, при помощи библиотек pdfkit, jinja2, pathlib и шаблона в формате html.
+        Генерирует pdf файл с 4 графиками и 2 таблицами, при помощи библиотек pdfkit, jinja2 и шаблона в формате html.
+        Изображение встраивается в html как data URI, поэтому graph.png для pdf не нужен.
+        Args:
+            image (bytes): Изображение из generate_image, если его нет - графики рисуются заново в памяти
         Creates:
             pdf: Файл report.pdf с 4 графиками и 2 таблицами
         """
-        environment = Environment(loader=FileSystemLoader('..'))
-        template = environment.get_template("pdf_template.html")
+        import pdfkit
+
+        if image is None:
+            image = self.render_image()
         values = []
-        for key in self.value6:
-            self.value6[key] = round(self.value6[key] * 100, 2)
+        value6 = {key: round(value * 100, 2) for key, value in sorted(self.value6.items(), key=lambda x: x[1])}
         for year in self.value1.keys():
             values.append([year, self.value1[year], self.value2[year], self.value3[year], self.value4[year]])
-        pdf_template = template.render({'name': self.vacancy_name,
-                                        'path': '{0}/{1}'.format(pathlib.Path(__file__).parent.resolve(),
-                                                                 'graph.png'), 'values': values,
-                                        'value5': self.value5, 'value6': self.value6})
+        pdf_template = get_template('pdf_template.html').render({'name': self.vacancy_name,
+                                                                 'image': image_uri(image),
+                                                                 'values': values,
+                                                                 'value5': self.value5, 'value6': value6})
         config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options={"enable-local-file-access": ""})
+        pdfkit.from_string(pdf_template, os.path.join(self.output_dir, 'report.pdf'), configuration=config)
+
+
+@functools.lru_cache(maxsize=None)
+def get_template(name):
+    """
+    Загружает и компилирует шаблон jinja2 из каталога модуля один раз на процесс.
+    Args:
+        name (str): Название шаблона
+    Returns:
+        Template: Скомпилированный шаблон
+    """
+    from jinja2 import Environment, FileSystemLoader
+
+    environment = Environment(loader=FileSystemLoader(os.path.dirname(os.path.abspath(__file__))))
+    return environment.get_template(name)
+
+
+def sheet_title(title):
+    """
+    Убирает из названия символы, недопустимые в названии листа Excel, и обрезает его до 31 символа.
+    Args:
+        title (str): Название
+    Returns:
+        str: Название листа
+    """
+    return title.translate(str.maketrans('', '', '\\/?*[]:'))[:31]
+
+
+def image_uri(image):
+    """
+    Превращает изображение в data URI для встраивания в html.
+    Args:
+        image (bytes): Изображение в формате png
+    Returns:
+        str: data URI изображения
+    """
+    return 'data:image/png;base64,' + base64.b64encode(image).decode('ascii')
+
+
+def render_artifact(method, vacancy_name, values, output_dir, *args):
+    """
+    Создает один файл отчета в рабочем процессе.
+    Args:
+        method (str): Метод Report: generate_excel, generate_image или generate_pdf
+        vacancy_name (str): Название вакансии
+        values (tuple): Словари статистики
+        output_dir (str): Каталог для файлов отчета
+        args: Аргументы метода
+    Returns:
+        Результат метода, для generate_image - изображение в формате png
+    """
+    return getattr(Report(vacancy_name, *values, output_dir=output_dir), method)(*args)
+
+
+def traced_artifact(traced, method, vacancy_name, values, output_dir, *args):
+    """
+    Создает один файл отчета в рабочем процессе и, если трассировка включена в родителе, замеряет его.
+    Args:
+        traced (bool): Включена ли трассировка в родительском процессе
+        method (str): Метод Report: generate_excel, generate_image или generate_pdf
+        vacancy_name (str): Название вакансии
+        values (tuple): Словари статистики
+        output_dir (str): Каталог для файлов отчета
+        args: Аргументы метода
+    Returns:
+        tuple: Результат метода и замеры этапов для instrumentation.trace.merge
+    """
+    with instrumentation.trace.collect() if traced else contextlib.nullcontext([]) as records:
+        result = render_artifact(method, vacancy_name, values, output_dir, *args)
+    return result, records
+
+
+def render_report(vacancy_name, values, output_dir='.', details=None, executor=None):
+    """
+    Создает report.xlsx, graph.png и report.pdf параллельно в пуле процессов.
+    Excel и график не зависят друг от друга, pdf ждет только график, который передается ему из памяти
+    и встраивается в html, поэтому общее время примерно равно времени самого долгого файла.
+    Args:
+        vacancy_name (str): Название вакансии
+        values (tuple): Словари статистики
+        output_dir (str): Каталог для файлов отчета
+        details (iterable): Строки вакансий для подробного листа; генератор нельзя передать в другой процесс,
+            поэтому в этом случае Excel пишется в отдельном потоке текущего процесса, пока график и pdf
+            создаются в пуле
+        executor (ProcessPoolExecutor): Общий пул для нескольких отчетов, None - создать пул для этого отчета
+    """
+    pool = futures.ProcessPoolExecutor(max_workers=3) if executor is None else contextlib.nullcontext(executor)
+    traced = instrumentation.trace.enabled
+    with instrumentation.stage('render'), pool as executor:
+        image = executor.submit(traced_artifact, traced, 'generate_image', vacancy_name, values, output_dir)
+        tasks, written = [image], None
+        if details is None:
+            tasks.append(executor.submit(traced_artifact, traced, 'generate_excel', vacancy_name, values, output_dir))
+        else:
+            report = Report(vacancy_name, *values, output_dir=output_dir)
+            writer = futures.ThreadPoolExecutor(max_workers=1)
+            written = writer.submit(report.generate_excel_streaming, details)
+            writer.shutdown(wait=False)
+        tasks.append(executor.submit(traced_artifact, traced, 'generate_pdf', vacancy_name, values, output_dir,
+                                     image.result()[0]))
+        for task in tasks:
+            instrumentation.trace.merge(task.result()[1])
+        if written is not None:
+            written.result()
+
+
+class BatchReport:
+    """
+    Выводит статистику многих профессий в одну книгу Excel.
+    Attributes:
+        workbook (Workbook): Книга Excel, создается в generate_excel
+        statistics (dict): Для каждой профессии кортеж со словарями статистик
+        output_dir (str): Каталог для файла отчета
+    """
+    def __init__(self, statistics, output_dir='.'):
+        """
+        Иницализация класса для вывода данных.
+        Args:
+            statistics (dict): Для каждой профессии кортеж со словарями статистик
+            output_dir (str): Каталог для файла отчета
+        """
+        self.workbook = None
+        self.statistics = statistics
+        self.output_dir = output_dir
+
+    @instrumentation.measure('generate_excel')
+    def generate_excel(self):
+        """
+        Генерирует общую таблицу по годам со столбцами для каждой профессии и таблицу по городам.
+        Creates:
+            Workbook: Файл report.xlsx с двумя страницами и таблицами в них
+        """
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, Border, Side
+        from openpyxl.utils import get_column_letter
+
+        self.workbook = Workbook()
+        font_bold = Font(bold=True)
+        thin = Side(border_style='thin', color='00000000')
+        border = Border(left=thin, bottom=thin, right=thin, top=thin)
+        value1, value2, _, _, value5, value6 = next(iter(self.statistics.values()))
+
+        page1 = self.workbook.active
+        page1.title = 'Статистика по годам'
+        header = ['Год', 'Средняя зарплата', 'Количество вакансий']
+        for vacancy_name in self.statistics:
+            header += ['Средняя зарплата - ' + vacancy_name, 'Количество вакансий - ' + vacancy_name]
+        page1.append(header)
+        for year in value1:
+            row = [year, value1[year], value2[year]]
+            for _, _, value3, value4, _, _ in self.statistics.values():
+                row += [value3.get(year, 0), value4.get(year, 0)]
+            page1.append(row)
+
+        page2 = self.workbook.create_sheet('Статистика по городам')
+        page2.append(['Город', 'Уровень зарплат', '', 'Город', 'Доля вакансий'])
+        for (city1, salary), (city2, share) in zip(value5.items(), value6.items()):
+            page2.append([city1, salary, '', city2, share])
+            page2.cell(row=page2.max_row, column=5).number_format = '0.00%'
+
+        for page in (page1, page2):
+            for i, column in enumerate(page.iter_cols(), 1):
+                page.column_dimensions[get_column_letter(i)].width = max(len(str(cell.value)) for cell in column) + 2
+                if not column[0].value:
+                    continue
+                column[0].font = font_bold
+                for cell in column:
+                    cell.border = border
+
+        self.workbook.save(filename=os.path.join(self.output_dir, 'report.xlsx'))
 
 
 class InputConnect:
@@ -323,26 +778,158 @@ class InputConnect:
     Attributes:
         file_name (str): Название файла
         vacancy_name (str): Название вакансии
+        workers (int): Количество процессов для разбора файла
+        state_file (str): Файл с состоянием для инкрементального подсчета статистики
+        details (bool): Добавить в report.xlsx лист со всеми вакансиями выбранной профессии
+        cache (ReportCache): Кэш готовых отчетов, None - не использовать кэш
     """
-    def __init__(self):
+    report_files = ('report.xlsx', 'graph.png', 'report.pdf')
+
+    def __init__(self, workers=1, state_file=None, details=False, cache_dir=report_cache.CACHE_DIR):
         """
         Инициализирует класс, выводит статистику в консоль, а так же запускает создание xlsx, png, pdf файлов.
+        Если такой отчет уже есть в кэше, файлы копируются из кэша, а статистика выводится из его записи.
+        Ключ кэша - хеш содержимого файла, а при инкрементальном подсчете - хеш обновленного состояния,
+        чтобы не читать весь файл.
+        Args:
+            workers (int): Количество процессов для разбора файла, при 1 файл разбирается в текущем процессе
+            state_file (str): Файл с состоянием для инкрементального подсчета статистики
+            details (bool): Добавить в report.xlsx лист со всеми вакансиями выбранной профессии
+            cache_dir (str): Каталог кэша готовых отчетов, None - не использовать кэш
         """
         self.file_name = input('Введите название файла: ')
         self.vacancy_name = input('Введите название профессии: ')
+        self.workers = workers
+        self.state_file = state_file
+        self.details = details
+        self.cache = None if cache_dir is None else report_cache.ReportCache(cache_dir)
+
+        parameters = {'report': 'pdf_2_1_3', 'vacancy_name': self.vacancy_name, 'details': self.details}
+        incremental_run = bool(self.state_file) and not self.details
+        if self.cache is not None and not incremental_run:
+            key = self.cache.key(self.file_name, **parameters)
+            if self.restore(key):
+                return
+
+        if self.details:
+            dataset = ColumnarDataSet(self.file_name, self.vacancy_name)
+        elif incremental_run:
+            dataset = IncrementalDataSet(self.file_name, self.vacancy_name, self.state_file)
+        elif self.workers > 1:
+            dataset = ParallelDataSet(self.file_name, self.vacancy_name, self.workers)
+        else:
+            dataset = ColumnarDataSet(self.file_name, self.vacancy_name)
+        values = dataset.get_statistic()
+        if self.cache is not None and incremental_run:
+            key = self.cache.digest_key(dataset.statistic.digest(), **parameters)
+            if self.restore(key, values):
+                return
+        dataset.print_statistic(*values)
+
+        render_report(self.vacancy_name, values, details=dataset.matching_vacancies() if self.details else None)
+        if self.cache is not None:
+            self.cache.store(key, self.report_files, parameters=parameters,
+                             statistics=[list(value.items()) for value in values])
+
+    def restore(self, key, values=None):
+        """
+        Копирует готовый отчет из кэша и выводит его статистику в консоль.
+        Args:
+            key (str): Ключ записи кэша
+            values (tuple): Уже посчитанные словари статистики, None - взять из записи кэша
+        Returns:
+            bool: Был ли отчет в кэше
+        """
+        if self.cache.restore(key) is None:
+            return False
+        statistics = (self.cache.metadata(key) or {}).get('statistics')
+        if values is None and statistics:
+            values = [dict(pairs) for pairs in statistics]
+        if values is not None:
+            DataSet.print_statistic(*values)
+        print('Отчет взят из кэша: ' + ', '.join(self.report_files))
+        return True
+
+
+def parse_args(args=None):
+    """
+    Разбирает аргументы командной строки.
+    Returns:
+        argparse.Namespace: Аргументы командной строки
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=1, help='количество процессов для разбора csv файла')
+    parser.add_argument('--state', help='файл состояния: при повторном запуске разбираются только дописанные строки')
+    parser.add_argument('--details', action='store_true',
+                        help='добавить в report.xlsx лист со всеми вакансиями профессии (потоковая запись)')
+    parser.add_argument('--trace', help='json файл для замеров времени и памяти по этапам (или переменная '
+                                           'окружения {0})'.format(instrumentation.ENVIRONMENT_VARIABLE))
+    parser.add_argument('--professions', help='файл со списком профессий, по одной на строку, для пакетного отчета')
+    parser.add_argument('--combined', action='store_true', help='пакетный отчет одной общей книгой Excel')
+    parser.add_argument('--no-cache', action='store_true', help='не брать готовый отчет из кэша и не сохранять его')
+    arguments = parser.parse_args(args)
+    if arguments.trace:
+        instrumentation.trace.enable(arguments.trace)
+    return arguments
+
+
+def safe_name(name):
+    """
+    Заменяет символы, недопустимые в именах файлов, чтобы использовать название как имя каталога.
+    Args:
+        name (str): Название
+    Returns:
+        str: Название для каталога
+    """
+    return name.translate(str.maketrans('\\/:*?"<>|', '_________'))
 
-        dataset = DataSet(self.file_name, self.vacancy_name)
-        value1, value2, value3, value4, value5, value6 = dataset.get_statistic()
-        dataset.print_statistic(value1, value2, value3, value4, value5, value6)
 
-        report = Report(self.vacancy_name, value1, value2, value3, value4, value5, value6)
-        report.generate_excel()
-        report.generate_image()
-        report.generate_pdf()
+def get_batch(file_name, vacancy_names, combined=False, output_dir='.'):
+    """
+    Формирует отчеты сразу для многих профессий за одно чтение файла.
+    Args:
+        file_name (str): Название файла
+        vacancy_names (list): Названия профессий
+        combined (bool): Одна общая книга Excel вместо отдельного отчета в своем каталоге на каждую профессию
+        output_dir (str): Каталог для отчетов
+    """
+    statistics = BatchDataSet(file_name, vacancy_names).get_statistics()
+    if combined:
+        BatchReport(statistics, output_dir).generate_excel()
+        return
+    with futures.ProcessPoolExecutor(max_workers=3) as executor:
+        for vacancy_name, values in statistics.items():
+            directory = os.path.join(output_dir, safe_name(vacancy_name))
+            os.makedirs(directory, exist_ok=True)
+            render_report(vacancy_name, values, directory, executor=executor)
+
+
+def get_pdf(workers=1, state_file=None, details=False, cache=True):
+    """
+    Запускает программу.
+    Args:
+        workers (int): Количество процессов для разбора файла
+        state_file (str): Файл с состоянием для инкрементального подсчета статистики
+        details (bool): Добавить в report.xlsx лист со всеми вакансиями выбранной профессии
+        cache (bool): Использовать кэш готовых отчетов
+    """
+    InputConnect(workers, state_file, details, report_cache.CACHE_DIR if cache else None)
 
 
-def get_pdf():
+def main(args=None):
     """
-    Запускает программу.
+    Разбирает аргументы командной строки и формирует пакетный отчет по списку профессий или отчет по одной профессии.
+    Args:
+        args (list): Аргументы командной строки, по умолчанию sys.argv
     """
-    InputConnect()
+    arguments = parse_args(args)
+    if arguments.professions:
+        with open(arguments.professions, encoding='utf-8') as professions:
+            names = [line.strip() for line in professions if line.strip()]
+        get_batch(input('Введите название файла: '), names, arguments.combined)
+    else:
+        get_pdf(arguments.workers, arguments.state, arguments.details, not arguments.no_cache)
+
+
+if __name__ == '__main__':
+    main()
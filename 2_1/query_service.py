@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import columnar
+from pdf_2_1_3 import ColumnarDataSet
+
+CHECK_INTERVAL = 1.0
+
+
+class ResidentDataset:
+    """
+    Держит вакансии в памяти в виде столбцов и перезагружает их, когда файл меняется.
+    Запросы получают ссылку на текущие столбцы, а перезагрузка подменяет ее целиком,
+    поэтому запросы во время перезагрузки отвечают по старым данным и никогда не видят наполовину загруженные.
+    Attributes:
+        file_name (str): Название csv файла
+        cache_dir (str): Каталог кэша столбцов, None - не использовать кэш
+        check_interval (float): Как часто в секундах проверять, изменился ли файл
+        columns (Columns): Текущие данные вакансий
+        version (tuple): Размер и время изменения файла, по которым загружены columns
+        loaded_at (float): Время последней загрузки
+        reloads (int): Количество перезагрузок после запуска
+        error (str): Ошибка последней попытки перезагрузки
+    """
+    def __init__(self, file_name, cache_dir=columnar.CACHE_DIR, check_interval=CHECK_INTERVAL):
+        """
+        Инициализирует объект ResidentDataset и загружает файл.
+        Args:
+            file_name (str): Название csv файла
+            cache_dir (str): Каталог кэша столбцов, None - не использовать кэш
+            check_interval (float): Как часто в секундах проверять, изменился ли файл
+        """
+        self.file_name = file_name
+        self.cache_dir = cache_dir
+        self.check_interval = check_interval
+        self.columns = None
+        self.version = None
+        self.loaded_at = None
+        self.reloads = -1
+        self.error = None
+        self.checked_at = 0
+        self.lock = threading.Lock()
+        self.reload(self.file_version())
+
+    def file_version(self):
+        stat = os.stat(self.file_name)
+        return stat.st_size, stat.st_mtime_ns
+
+    def reload(self, version):
+        """
+        Загружает файл и подменяет текущие столбцы.
+        Файл без вакансий (пустой или только с заголовком, например, пока его перезаписывают) не принимается.
+        Args:
+            version (tuple): Размер и время изменения файла до загрузки
+        Raises:
+            ValueError: В файле нет ни одной вакансии, текущие столбцы остаются прежними
+        """
+        columns = columnar.load_columns(self.file_name, self.cache_dir)
+        if not len(columns):
+            raise ValueError('в файле {0} нет вакансий'.format(self.file_name))
+        self.columns = columns
+        self.version = version
+        self.loaded_at = time.time()
+        self.reloads += 1
+        self.error = None
+
+    def current(self):
+        """
+        Возвращает текущие столбцы, перед этим перезагружая их, если файл изменился.
+        Файл проверяется не чаще раза в check_interval секунд, перезагружает только один поток.
+        Если перезагрузка не удалась (например, файл еще дописывается или пуст), остаются старые данные.
+        Returns:
+            Columns: Данные вакансий
+        """
+        if time.monotonic() - self.checked_at >= self.check_interval and self.lock.acquire(blocking=False):
+            try:
+                self.checked_at = time.monotonic()
+                version = self.file_version()
+                if version != self.version:
+                    self.reload(version)
+            except (OSError, ValueError, KeyError) as error:
+                self.error = '{0}: {1}'.format(type(error).__name__, error)
+            finally:
+                self.lock.release()
+        return self.columns
+
+    def info(self):
+        return {'file': os.path.abspath(self.file_name), 'rows': len(self.current()),
+                'loaded_at': self.loaded_at, 'reloads': self.reloads, 'error': self.error}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Отвечает на GET запросы статистики в формате json.
+    Пути:
+        /info - сведения о загруженном файле
+        /statistics?profession=...&region=... - все словари статистики, как у DataSet.get_statistic
+        /years?profession=...&region=... - динамика зарплат и количества вакансий по годам
+        /cities - уровень зарплат и доля вакансий по городам
+    Без region статистика профессии считается по всем городам.
+    Если не задан обязательный параметр, ответ 400, если статистику посчитать не удалось - 500 с текстом ошибки.
+    """
+    dataset = None
+    required = {'/statistics': ['profession'], '/years': ['profession']}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        routes = {'/info': self.info, '/statistics': self.statistics, '/years': self.years, '/cities': self.cities}
+        if url.path not in routes:
+            self.send_json(404, {'error': 'Неизвестный путь: ' + url.path, 'paths': list(routes)})
+            return
+        missing = [key for key in self.required.get(url.path, []) if key not in query]
+        if missing:
+            self.send_json(400, {'error': 'Не задан параметр {0}'.format(', '.join(missing))})
+            return
+        try:
+            self.send_json(200, routes[url.path](query))
+        except Exception as error:
+            self.send_json(500, {'error': '{0}: {1}'.format(type(error).__name__, error)})
+
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+    def statistic(self, query):
+        return ColumnarDataSet.statistic_for(self.dataset.current(), query['profession'], query.get('region', ''))
+
+    def info(self, query):
+        return self.dataset.info()
+
+    def statistics(self, query):
+        value1, value2, value3, value4, value5, value6 = self.statistic(query)
+        return {'salary_by_year': value1, 'count_by_year': value2,
+                'profession_salary_by_year': value3, 'profession_count_by_year': value4,
+                'salary_by_city': value5, 'share_by_city': value6}
+
+    def years(self, query):
+        value1, value2, value3, value4, _, _ = self.statistic(query)
+        return {str(year): {'salary': value1[year], 'count': value2[year],
+                            'profession_salary': value3[year], 'profession_count': value4[year]} for year in value1}
+
+    def cities(self, query):
+        _, _, _, _, value5, value6 = ColumnarDataSet.statistic_for(self.dataset.current(), '')
+        return {'salary': value5, 'share': value6}
+
+
+def create_server(file_name, host='127.0.0.1', port=8000, cache_dir=columnar.CACHE_DIR,
+                  check_interval=CHECK_INTERVAL):
+    """
+    Загружает файл и создает сервер, каждый запрос обрабатывается в своем потоке.
+    Args:
+        file_name (str): Название csv файла
+        host (str): Адрес
+        port (int): Порт, 0 - любой свободный
+        cache_dir (str): Каталог кэша столбцов, None - не использовать кэш
+        check_interval (float): Как часто в секундах проверять, изменился ли файл
+    Returns:
+        ThreadingHTTPServer: Сервер, server_address содержит выбранный порт
+    """
+    handler = type('Handler', (QueryHandler,), {'dataset': ResidentDataset(file_name, cache_dir, check_interval)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Сервис статистики по вакансиям, который держит файл в памяти')
+    parser.add_argument('file', help='csv файл с вакансиями')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--check-interval', type=float, default=CHECK_INTERVAL,
+                        help='как часто в секундах проверять, изменился ли файл')
+    arguments = parser.parse_args()
+    server = create_server(arguments.file, arguments.host, arguments.port, check_interval=arguments.check_interval)
+    print('Сервис запущен: http://{0}:{1}/info'.format(*server.server_address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,242 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+ENVIRONMENT_VARIABLE = 'VACANCY_REPORT_CACHE'
+CACHE_DIR = os.environ.get(ENVIRONMENT_VARIABLE, '.report_cache')
+MAX_SIZE = 512 << 20
+VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+META_FILE = 'meta.json'
+HASHES_FILE = 'hashes.json'
+
+
+def content_hash(file_name):
+    """
+    Считает хеш всего содержимого файла.
+    Args:
+        file_name (str): Название файла
+    Returns:
+        str: Хеш содержимого
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """
+    Кэш готовых файлов отчета, адресуемый содержимым: ключ зависит от хеша содержимого файла с вакансиями
+    и параметров запроса, но не от пути к файлу, поэтому один каталог кэша можно использовать совместно.
+    Каждая запись - отдельный каталог с файлами отчета и meta.json, время изменения meta.json
+    обновляется при каждом попадании и служит временем последнего использования для вытеснения LRU.
+    Attributes:
+        cache_dir (str): Каталог кэша
+        max_size (int): Максимальный размер кэша в байтах
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_size=MAX_SIZE):
+        """
+        Инициализирует объект ReportCache.
+        Args:
+            cache_dir (str): Каталог кэша
+            max_size (int): Максимальный размер кэша в байтах
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def file_hash(self, file_name):
+        """
+        Возвращает хеш содержимого файла. Хеш запоминается вместе с размером и временем изменения файла,
+        поэтому файл перечитывается целиком, только если он изменился.
+        Args:
+            file_name (str): Название файла
+        Returns:
+            str: Хеш содержимого
+        """
+        path = os.path.abspath(file_name)
+        stat = os.stat(path)
+        hashes_file = os.path.join(self.cache_dir, HASHES_FILE)
+        try:
+            with open(hashes_file, encoding='utf-8') as file:
+                hashes = json.load(file)
+        except (OSError, ValueError):
+            hashes = {}
+        if hashes.get(path, [None, None, None])[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return hashes[path][2]
+        digest = content_hash(path)
+        hashes[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp = '{0}.{1}.tmp'.format(hashes_file, os.getpid())
+        with open(temp, 'w', encoding='utf-8') as file:
+            json.dump(hashes, file, ensure_ascii=False)
+        os.replace(temp, hashes_file)
+        return digest
+
+    def key(self, file_name, **parameters):
+        """
+        Считает ключ отчета.
+        Args:
+            file_name (str): Название файла с вакансиями
+            parameters: Параметры запроса (профессия, регион и т.п.)
+        Returns:
+            str: Ключ записи кэша
+        """
+        return self.digest_key(self.file_hash(file_name), **parameters)
+
+    @staticmethod
+    def digest_key(digest, **parameters):
+        """
+        Считает ключ отчета по уже известному хешу данных, например по хешу состояния инкрементальной статистики,
+        чтобы не читать весь файл.
+        Args:
+            digest (str): Хеш данных, по которым строится отчет
+            parameters: Параметры запроса (профессия, регион и т.п.)
+        Returns:
+            str: Ключ записи кэша
+        """
+        data = json.dumps({'version': VERSION, 'file': digest, 'parameters': parameters},
+                          ensure_ascii=False, sort_keys=True)
+        return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+    def metadata(self, key):
+        """
+        Читает meta.json записи кэша.
+        Args:
+            key (str): Ключ записи кэша
+        Returns:
+            dict: Файлы, параметры и сохраненная статистика записи или None, если записи нет
+        """
+        try:
+            with open(os.path.join(self.cache_dir, key, META_FILE), encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def restore(self, key, output_dir='.'):
+        """
+        Копирует файлы отчета из кэша в каталог.
+        Args:
+            key (str): Ключ записи кэша
+            output_dir (str): Каталог для файлов отчета
+        Returns:
+            list: Названия скопированных файлов или None, если отчета нет в кэше
+        """
+        directory = os.path.join(self.cache_dir, key)
+        meta = self.metadata(key)
+        if meta is None:
+            return None
+        try:
+            for name in meta['files']:
+                shutil.copyfile(os.path.join(directory, name), os.path.join(output_dir, name))
+            os.utime(os.path.join(directory, META_FILE))
+        except (OSError, KeyError):
+            return None
+        return meta['files']
+
+    def store(self, key, file_names, output_dir='.', parameters=None, statistics=None):
+        """
+        Сохраняет файлы отчета в кэш и вытесняет давно не использованные записи, если кэш стал больше max_size.
+        Запись сначала собирается во временном каталоге, поэтому другие процессы не видят ее наполовину записанной.
+        Args:
+            key (str): Ключ записи кэша
+            file_names (list): Названия файлов отчета
+            output_dir (str): Каталог, в котором лежат файлы отчета
+            parameters (dict): Параметры запроса для просмотра кэша
+            statistics (list): Статистика отчета для вывода в консоль при попадании в кэш
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            for name in file_names:
+                shutil.copyfile(os.path.join(output_dir, name), os.path.join(temp, name))
+            with open(os.path.join(temp, META_FILE), 'w', encoding='utf-8') as file:
+                json.dump({'files': list(file_names), 'parameters': parameters or {}, 'statistics': statistics,
+                           'created': time.time()}, file, ensure_ascii=False)
+            os.replace(temp, os.path.join(self.cache_dir, key))
+        except OSError:
+            shutil.rmtree(temp, ignore_errors=True)
+            return
+        self.evict()
+
+    def entries(self):
+        """
+        Перечисляет записи кэша от недавно использованных к давно не использованным.
+        Returns:
+            list: Словари с ключом, параметрами, файлами, размером и временем последнего использования
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            directory = os.path.join(self.cache_dir, key)
+            if key.startswith('.') or not os.path.isdir(directory):
+                continue
+            try:
+                with open(os.path.join(directory, META_FILE), encoding='utf-8') as file:
+                    meta = json.load(file)
+                last_used = os.path.getmtime(os.path.join(directory, META_FILE))
+                size = sum(entry.stat().st_size for entry in os.scandir(directory))
+            except (OSError, ValueError):
+                continue
+            entries.append({'key': key, 'parameters': meta.get('parameters', {}), 'files': meta.get('files', []),
+                            'size': size, 'last_used': last_used})
+        return sorted(entries, key=lambda entry: entry['last_used'], reverse=True)
+
+    def evict(self):
+        """
+        Удаляет давно не использованные записи, пока размер кэша больше max_size.
+        Returns:
+            list: Ключи удаленных записей
+        """
+        entries = self.entries()
+        total = sum(entry['size'] for entry in entries)
+        removed = []
+        while entries and total > self.max_size:
+            entry = entries.pop()
+            shutil.rmtree(os.path.join(self.cache_dir, entry['key']), ignore_errors=True)
+            total -= entry['size']
+            removed.append(entry['key'])
+        return removed
+
+    def purge(self, keys=None):
+        """
+        Удаляет записи кэша.
+        Args:
+            keys (list): Ключи записей, None - очистить весь кэш
+        Returns:
+            list: Ключи удаленных записей
+        """
+        if keys is None:
+            keys = [entry['key'] for entry in self.entries()]
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            return keys
+        for key in keys:
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+        return list(keys)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Просмотр и очистка кэша готовых отчетов')
+    parser.add_argument('command', choices=['list', 'purge'])
+    parser.add_argument('keys', nargs='*', help='ключи записей для purge, без ключей кэш очищается целиком')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help='каталог кэша (или переменная окружения {0})'.format(ENVIRONMENT_VARIABLE))
+    arguments = parser.parse_args()
+    cache = ReportCache(arguments.cache_dir)
+    if arguments.command == 'list':
+        entries = cache.entries()
+        for entry in entries:
+            print('{0}  {1:8.2f} МБ  {2}  {3}  {4}'.format(
+                entry['key'], entry['size'] / 2 ** 20,
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['last_used'])),
+                json.dumps(entry['parameters'], ensure_ascii=False), ', '.join(entry['files'])))
+        print('Записей: {0}, всего {1:.2f} МБ'.format(len(entries), sum(entry['size'] for entry in entries) / 2 ** 20))
+    else:
+        removed = cache.purge(arguments.keys or None)
+        print('Удалено записей: {0}'.format(len(removed)))
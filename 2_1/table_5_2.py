@@ -1,8 +1,16 @@
+import bisect
 import csv
-import re
+import datetime
+import heapq
+import itertools
+from array import array
+from collections import deque
 
 from prettytable import PrettyTable
 
+import filter_expression
+import text_cleaner
+
 currency_to_rub = {
     "AZN": 35.68,
     "BYR": 23.91,
@@ -62,6 +70,8 @@ class Salary:
         salary_currency (str): Валюта оклада
         salary_average (float): Средняя зарплата
     """
+    __slots__ = ('salary_from', 'salary_to', 'salary_gross', 'salary_currency', 'salary_average')
+
     def __init__(self, vacancy):
         """
         Инициализирует объект Salary.
@@ -88,6 +98,9 @@ class Salary:
 class Vacancy:
     """
     Класс для вакансии и ее характеристик.
+    Хранит сырые поля строки csv в __slots__, а очистку html, сокращение текста, перевод и форматирование
+    выполняет только при обращении к характеристике. Фильтры и ключи сортировки берут дешевые характеристики,
+    а дорогое форматирование для вывода выполняется только для вакансий, которые попали в таблицу.
     Attributes:
         order (list): Лист с названиями характеристик для вакансии
         dic_experience_weight_dictionary (dict): Словарь для обозначения опыта работы по цифрам
@@ -106,6 +119,10 @@ class Vacancy:
         published (str): Место публикации
         published_at (str): Время публикации
     """
+    __slots__ = ('index', 'raw_name', 'raw_description', 'raw_key_skills', 'raw_experience_id', 'raw_premium',
+                 'employer_name', 'raw_salary_from', 'raw_salary_to', 'raw_salary_gross', 'salary_currency',
+                 'area_name', 'published')
+
     order = ['index', 'name', 'description', 'key_skills', 'experience_id', 'premium', 'employer_name', 'salary',
              'area_name', 'published_at']
     dic_experience_weight_dictionary = {
@@ -122,30 +139,27 @@ class Vacancy:
             vacancy (dict): словарь с характеристиками вакансии
         """
         self.index = 0
-        self.name = self.clear_html(vacancy['name'])
-        self.description = self.shortener(self.clear_html(vacancy['description']))
-        self.skills = vacancy['key_skills'].split('\n')
-        self.key_skills = self.shortener(vacancy['key_skills'])
-        self.skills_length = len(self.skills)
-        self.experience_id = dic_experience[vacancy['experience_id']]
-        self.premium = 'Да' if vacancy['premium'].lower() == 'true' else 'Нет'
+        self.raw_name = vacancy['name']
+        self.raw_description = vacancy['description']
+        self.raw_key_skills = vacancy['key_skills']
+        self.raw_experience_id = vacancy['experience_id']
+        self.raw_premium = vacancy['premium']
         self.employer_name = vacancy['employer_name']
-        self.salary_class = Salary(vacancy)
-        self.salary = str(self.salary_class)
+        self.raw_salary_from = vacancy['salary_from']
+        self.raw_salary_to = vacancy['salary_to']
+        self.raw_salary_gross = vacancy['salary_gross']
+        self.salary_currency = vacancy['salary_currency']
         self.area_name = vacancy['area_name']
         self.published = vacancy['published_at']
-        self.published_at = '{0[2]}.{0[1]}.{0[0]}'.format(vacancy['published_at'][:10].split('-'))
 
     @staticmethod
     def clear_html(string):
         """
-        Удаляет html теги и лишние пробелы из строки.
+        Удаляет html теги и лишние пробелы из строки (см. text_cleaner.clean_html).
         Returns:
              str: Строку без html тегов и лишних пробелов
         """
-        result = re.sub(r'<.*?>', '', string)
-        result = re.sub(r'\s+', ' ', result)
-        return result.strip()
+        return text_cleaner.clean_html(string)
 
     @staticmethod
     def shortener(string):
@@ -157,31 +171,113 @@ class Vacancy:
         return string if len(string) <= 100 else string[:100] + '...'
 
     @property
-    def salary_to(self):
+    def name(self):
         """
-        Берет верхнюю границу зарплаты из класса зарплат.
+        Очищает название вакансии от html тегов.
         Returns:
-            int: Верхнюю границу зарплаты
+            str: Название вакансии
         """
-        return self.salary_class.salary_to
+        return self.clear_html(self.raw_name)
 
     @property
-    def salary_average(self):
+    def description(self):
         """
-        Берет среднюю зарплаты из класса зарплат.
+        Очищает описание от html тегов и сокращает его до 100 символов.
         Returns:
-            int: Среднюю зарплату
+            str: Описание вакансии
+        """
+        return self.shortener(self.clear_html(self.raw_description))
+
+    @property
+    def skills(self):
+        """
+        Разбивает навыки по строкам.
+        Returns:
+            list: Требуемые навыки
+        """
+        return self.raw_key_skills.split('\n')
+
+    @property
+    def key_skills(self):
+        """
+        Сокращает навыки до 100 символов.
+        Returns:
+            str: Навыки для вывода
+        """
+        return self.shortener(self.raw_key_skills)
+
+    @property
+    def skills_length(self):
+        """
+        Считает количество навыков без разбиения строки.
+        Returns:
+            int: Количество навыков
+        """
+        return self.raw_key_skills.count('\n') + 1
+
+    @property
+    def experience_id(self):
+        """
+        Переводит опыт работы на русский язык.
+        Returns:
+            str: Опыт работы
+        """
+        return dic_experience[self.raw_experience_id]
+
+    @property
+    def premium(self):
+        """
+        Переводит признак премиум-вакансии.
+        Returns:
+            str: Да или Нет
+        """
+        return 'Да' if self.raw_premium.lower() == 'true' else 'Нет'
+
+    @property
+    def salary_class(self):
+        """
+        Создает объект зарплаты для вывода.
+        Returns:
+            Salary: Данные о зарплате
+        """
+        return Salary({'salary_from': self.raw_salary_from, 'salary_to': self.raw_salary_to,
+                       'salary_gross': self.raw_salary_gross, 'salary_currency': self.salary_currency})
+
+    @property
+    def salary(self):
+        """
+        Форматирует данные о зарплате.
+        Returns:
+            str: Данные о зарплате в виде одной строки
+        """
+        return str(self.salary_class)
+
+    @property
+    def published_at(self):
+        """
+        Форматирует дату публикации.
+        Returns:
+            str: Дата в формате дд.мм.гггг
         """
-        return self.salary_class.salary_average
+        return '{0[2]}.{0[1]}.{0[0]}'.format(self.published[:10].split('-'))
 
     @property
-    def salary_currency(self):
+    def salary_to(self):
         """
-        Берет валюту зарплаты из класса зарплат.
+        Берет верхнюю границу зарплаты из сырого поля.
         Returns:
-            str: Курс валюты зарплаты
+            int: Верхнюю границу зарплаты
         """
-        return self.salary_class.salary_currency
+        return int(float(self.raw_salary_to))
+
+    @property
+    def salary_average(self):
+        """
+        Считает среднюю зарплату в рублях.
+        Returns:
+            int: Среднюю зарплату
+        """
+        return currency_to_rub[self.salary_currency] * (self.salary_from + self.salary_to) / 2
 
     @property
     def experience_weight(self):
@@ -195,11 +291,21 @@ class Vacancy:
     @property
     def salary_from(self):
         """
-        Берет нижнюю границу зарплаты из класса зарплат.
+        Берет нижнюю границу зарплаты из сырого поля.
         Returns:
             int: Нижнюю границу зарплаты
         """
-        return self.salary_class.salary_from
+        return int(float(self.raw_salary_from))
+
+    @property
+    def salary_range_rub(self):
+        """
+        Переводит вилку оклада в рубли.
+        Returns:
+            tuple: Нижнюю и верхнюю границу зарплаты в рублях
+        """
+        rate = currency_to_rub[self.salary_currency]
+        return rate * self.salary_from, rate * self.salary_to
 
     def get_list(self):
         """
@@ -210,17 +316,798 @@ class Vacancy:
         return [getattr(self, key) for key in self.order]
 
 
+class IntervalIndex:
+    """
+    Индекс по отрезкам (вилкам окладов): находит отрезки, которые содержат число или пересекаются с диапазоном,
+    за O(log n + k), где k - размер ответа.
+    Отрезки, содержащие число, ищутся в дереве с центрами (centered interval tree): в каждом узле хранятся
+    отрезки, содержащие центр узла, отсортированные по началу и по концу, левее центра лежат отрезки,
+    которые кончаются раньше центра, правее - которые начинаются позже. Спуск по дереву берет из каждого узла
+    только подходящий префикс одного из списков, найденный бинарным поиском.
+    Отрезок пересекается с [low, high], если содержит low или начинается в (low, high], поэтому пересечение -
+    это ответ для low и срез отсортированных начал. Отрезки с началом больше конца в дерево не попадают
+    и проверяются перебором, их в данных практически нет.
+    Attributes:
+        intervals (list): Отрезок (начало, конец) для каждого номера вакансии
+        by_start (list): Номера отрезков по возрастанию начала
+        starts (list): Начала отрезков в том же порядке
+        by_end (list): Номера отрезков по возрастанию конца
+        ends (list): Концы отрезков в том же порядке
+        inverted (list): Номера отрезков с началом больше конца
+        root (list): Корень дерева: [центр, начала, номера по началу, минус концы, номера по концу, левый, правый]
+    """
+    def __init__(self, intervals):
+        """
+        Инициализирует объект IntervalIndex и строит дерево.
+        Args:
+            intervals (list): Отрезок (начало, конец) для каждого номера вакансии
+        """
+        self.intervals = intervals
+        positions = [position for position, (start, end) in enumerate(intervals) if start <= end]
+        self.inverted = [position for position, (start, end) in enumerate(intervals) if start > end]
+        self.by_start = sorted(positions, key=lambda position: intervals[position][0])
+        self.starts = [intervals[position][0] for position in self.by_start]
+        self.by_end = sorted(positions, key=lambda position: intervals[position][1])
+        self.ends = [intervals[position][1] for position in self.by_end]
+        self.root = self.build(self.by_start)
+
+    def build(self, positions):
+        """
+        Строит узел дерева для отрезков.
+        Args:
+            positions (list): Номера отрезков по возрастанию начала
+        Returns:
+            list: Узел дерева или None
+        """
+        if not positions:
+            return None
+        intervals = self.intervals
+        center = intervals[positions[len(positions) // 2]][0]
+        left, middle, right = [], [], []
+        for position in positions:
+            start, end = intervals[position]
+            if end < center:
+                left.append(position)
+            elif start > center:
+                right.append(position)
+            else:
+                middle.append(position)
+        by_end = sorted(middle, key=lambda position: -intervals[position][1])
+        return [center, [intervals[position][0] for position in middle], middle,
+                [-intervals[position][1] for position in by_end], by_end, self.build(left), self.build(right)]
+
+    def stab(self, value):
+        """
+        Находит отрезки, которые содержат число.
+        Args:
+            value (float): Число
+        Returns:
+            list: Номера отрезков по возрастанию
+        """
+        return sorted(self.containing(value))
+
+    def containing(self, value):
+        result, node = [], self.root
+        while node is not None:
+            center, starts, by_start, ends, by_end, left, right = node
+            if value < center:
+                result.extend(by_start[:bisect.bisect_right(starts, value)])
+                node = left
+            else:
+                result.extend(by_end[:bisect.bisect_right(ends, -value)])
+                node = right
+        return result
+
+    def overlap(self, low, high):
+        """
+        Находит отрезки, которые пересекаются с диапазоном [low, high], то есть начинаются не позже high
+        и кончаются не раньше low, как у DataSet.cond_to_range.
+        Args:
+            low (float): Нижняя граница или None
+            high (float): Верхняя граница или None
+        Returns:
+            list: Номера отрезков по возрастанию
+        """
+        if low is None and high is None:
+            result = list(self.by_start)
+        elif low is None:
+            result = self.by_start[:bisect.bisect_right(self.starts, high)]
+        elif high is None:
+            result = self.by_end[bisect.bisect_left(self.ends, low):]
+        elif low <= high:
+            result = self.containing(low) + self.by_start[bisect.bisect_right(self.starts, low):
+                                                          bisect.bisect_right(self.starts, high)]
+        else:
+            result = [position for position in self.containing(high) if self.intervals[position][1] >= low]
+        result.extend(position for position in self.inverted if self.overlaps(self.intervals[position], low, high))
+        return sorted(result)
+
+    def count_containing(self, value):
+        """
+        Считает отрезки, которые содержат число, не собирая их: это отрезки с началом не больше числа
+        без тех, что кончаются раньше него.
+        Args:
+            value (float): Число
+        Returns:
+            int: Количество отрезков
+        """
+        return bisect.bisect_right(self.starts, value) - bisect.bisect_left(self.ends, value)
+
+    def count_overlap(self, low, high):
+        """
+        Оценивает количество отрезков, которые пересекаются с диапазоном [low, high], бинарным поиском
+        по началам и концам. При low <= high оценка точная, при low > high - сверху.
+        Args:
+            low (float): Нижняя граница или None
+            high (float): Верхняя граница или None
+        Returns:
+            int: Количество отрезков
+        """
+        count = len(self.starts) if high is None else bisect.bisect_right(self.starts, high)
+        if low is not None:
+            count -= bisect.bisect_left(self.ends, low) if high is None or low <= high else 0
+        return count + sum(self.overlaps(self.intervals[position], low, high) for position in self.inverted)
+
+    @staticmethod
+    def overlaps(interval, low, high):
+        """
+        Проверяет, пересекается ли отрезок с диапазоном.
+        Args:
+            interval (tuple): Начало и конец отрезка
+            low (float): Нижняя граница диапазона или None
+            high (float): Верхняя граница диапазона или None
+        Returns:
+            bool: Пересекаются ли они
+        """
+        return (low is None or interval[1] >= low) and (high is None or interval[0] <= high)
+
+
+class DateIndex:
+    """
+    Индекс по дате публикации: номера вакансий, упорядоченные по published.
+    Строки published в формате ISO упорядочены так же, как даты, и это тот же ключ, по которому сортирует
+    DataSet.sort_rows, поэтому готовый порядок индекса совпадает с результатом сортировки, включая порядок
+    вакансий с одинаковой датой. Диапазон дат - это срез упорядоченного массива, найденный бинарным поиском.
+    Attributes:
+        keys (list): Даты публикации по возрастанию
+        by_date (list): Номера вакансий в том же порядке, при равных датах по возрастанию номера
+        orders (dict): Порядок номеров по возрастанию (False) и убыванию (True) даты
+        ranks (dict): Для каждого порядка место каждой вакансии в нем
+    """
+    def __init__(self, published):
+        """
+        Инициализирует объект DateIndex.
+        Args:
+            published (list): Дата публикации для каждого номера вакансии
+        """
+        self.by_date = sorted(range(len(published)), key=published.__getitem__)
+        self.keys = [published[position] for position in self.by_date]
+        self.orders = {False: self.by_date}
+        self.ranks = {}
+
+    @staticmethod
+    def parse_bound(value):
+        """
+        Переводит границу диапазона дат из ввода пользователя в дату ISO.
+        Отрицательное число - сколько дней назад от сегодняшнего дня, например, '-30..' - последние 30 дней.
+        Args:
+            value (str): Дата в формате дд.мм.гггг или количество дней со знаком минус
+        Returns:
+            str: Дата в формате гггг-мм-дд
+        """
+        if value.startswith('-') and value[1:].isdigit():
+            return (datetime.date.today() - datetime.timedelta(days=int(value[1:]))).isoformat()
+        return datetime.datetime.strptime(value, '%d.%m.%Y').strftime('%Y-%m-%d')
+
+    def between(self, low, high):
+        """
+        Находит вакансии, опубликованные в диапазоне дат включительно.
+        Args:
+            low (str): Первая дата в формате гггг-мм-дд или None
+            high (str): Последняя дата в формате гггг-мм-дд или None
+        Returns:
+            list: Номера вакансий по возрастанию
+        """
+        start, end = self.bounds(low, high)
+        return sorted(self.by_date[start:end])
+
+    def count_between(self, low, high):
+        """
+        Считает вакансии, опубликованные в диапазоне дат включительно, не собирая их.
+        Args:
+            low (str): Первая дата в формате гггг-мм-дд или None
+            high (str): Последняя дата в формате гггг-мм-дд или None
+        Returns:
+            int: Количество вакансий
+        """
+        start, end = self.bounds(low, high)
+        return max(end - start, 0)
+
+    def bounds(self, low, high):
+        start = 0 if low is None else bisect.bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect.bisect_right(self.keys, high + '\uffff')
+        return start, end
+
+    def last_days(self, days, today=None):
+        """
+        Находит вакансии, опубликованные за последние дни.
+        Args:
+            days (int): Количество дней
+            today (datetime.date): От какого дня отсчитывать, по умолчанию сегодня
+        Returns:
+            list: Номера вакансий по возрастанию
+        """
+        return self.between(((today or datetime.date.today()) - datetime.timedelta(days=days)).isoformat(), None)
+
+    def order(self, reverse=False):
+        """
+        Возвращает номера вакансий в порядке даты публикации.
+        Порядок по убыванию строится один раз: группы одинаковых дат идут в обратном порядке,
+        а внутри группы номера остаются по возрастанию, как после sorted(..., reverse=True).
+        Args:
+            reverse (bool): По убыванию даты
+        Returns:
+            list: Номера вакансий
+        """
+        if reverse not in self.orders:
+            result, end = [], len(self.keys)
+            while end > 0:
+                start = bisect.bisect_left(self.keys, self.keys[end - 1], 0, end)
+                result.extend(self.by_date[start:end])
+                end = start
+            self.orders[reverse] = result
+        return self.orders[reverse]
+
+    def rank(self, reverse=False):
+        """
+        Возвращает место каждой вакансии в порядке даты публикации.
+        Args:
+            reverse (bool): По убыванию даты
+        Returns:
+            list: Место в порядке для каждого номера вакансии
+        """
+        if reverse not in self.ranks:
+            rank = [0] * len(self.keys)
+            for place, position in enumerate(self.order(reverse)):
+                rank[position] = place
+            self.ranks[reverse] = rank
+        return self.ranks[reverse]
+
+    def sort(self, positions, reverse=False, limit=None):
+        """
+        Упорядочивает вакансии по дате публикации без сравнения дат.
+        Все вакансии - это готовый порядок индекса, выборка сортируется по целым местам в нем.
+        Args:
+            positions (list): Номера вакансий или None, если нужны все
+            reverse (bool): По убыванию даты
+            limit (int): Сколько первых вакансий нужно, None - все
+        Returns:
+            list: Номера вакансий в порядке даты публикации
+        """
+        if positions is None:
+            return self.order(reverse)[:limit]
+        rank = self.rank(reverse)
+        if limit is not None and limit * 10 < len(positions):
+            return heapq.nsmallest(limit, positions, key=rank.__getitem__)
+        return sorted(positions, key=rank.__getitem__)[:limit]
+
+
+class SortKeys:
+    """
+    Ключи сортировки загруженных вакансий, посчитанные один раз для каждого столбца и переиспользуемые
+    между запросами. Значения столбца заменяются их местом среди уникальных значений, поэтому ключ любого
+    столбца - целое число в компактном массиве, а ключи нескольких столбцов с направлениями упаковываются
+    в одно целое число на вакансию. Сортировка номеров вакансий по этому числу устойчива и дает тот же порядок,
+    что последовательные устойчивые сортировки по столбцам от последнего к первому.
+    Attributes:
+        vacancies (list): Вакансии
+        codes (dict): Характеристика вакансии -> место значения каждой вакансии среди уникальных значений
+        sizes (dict): Характеристика вакансии -> количество уникальных значений
+        composites (dict): Столбцы с направлениями -> упакованный ключ каждой вакансии
+    """
+    def __init__(self, vacancies):
+        """
+        Инициализирует объект SortKeys, ключи считаются по мере надобности.
+        Args:
+            vacancies (list): Вакансии
+        """
+        self.vacancies = vacancies
+        self.codes = {}
+        self.sizes = {}
+        self.composites = {}
+
+    def column(self, attribute):
+        """
+        Возвращает ключи столбца, при первом обращении считает их.
+        Args:
+            attribute (str): Характеристика вакансии
+        Returns:
+            array: Место значения каждой вакансии среди уникальных значений столбца
+        """
+        if attribute not in self.codes:
+            values = [getattr(vacancy, attribute) for vacancy in self.vacancies]
+            unique = {value: code for code, value in enumerate(sorted(set(values)))}
+            self.codes[attribute] = array('l', [unique[value] for value in values])
+            self.sizes[attribute] = len(unique)
+        return self.codes[attribute]
+
+    def composite(self, columns):
+        """
+        Возвращает упакованный ключ для нескольких столбцов, при первом обращении считает его.
+        Args:
+            columns (tuple): Пары (характеристика вакансии, по убыванию) от главного столбца к второстепенным
+        Returns:
+            list: Ключ каждой вакансии
+        """
+        if columns not in self.composites:
+            keys = [0] * len(self.vacancies)
+            for attribute, reverse in columns:
+                codes, size = self.column(attribute), self.sizes[attribute]
+                if reverse:
+                    keys = [key * size + size - 1 - code for key, code in zip(keys, codes)]
+                else:
+                    keys = [key * size + code for key, code in zip(keys, codes)]
+            bound = 1
+            for attribute, _ in columns:
+                bound *= self.sizes[attribute]
+            self.composites[columns] = array('q', keys) if bound < 1 << 63 else keys
+        return self.composites[columns]
+
+    def argsort(self, positions, columns, limit=None):
+        """
+        Упорядочивает вакансии по нескольким столбцам.
+        Args:
+            positions (list): Номера вакансий или None, если нужны все
+            columns (list): Пары (характеристика вакансии, по убыванию) от главного столбца к второстепенным
+            limit (int): Сколько первых вакансий нужно, None - все
+        Returns:
+            list: Номера вакансий в порядке сортировки
+        """
+        key = self.composite(tuple(columns)).__getitem__
+        positions = range(len(self.vacancies)) if positions is None else positions
+        if limit is not None and limit * 10 < len(positions):
+            return heapq.nsmallest(limit, positions, key=key)
+        return sorted(positions, key=key)[:limit]
+
+
+class VacancyIndex:
+    """
+    Вторичные индексы по вакансиям: хеш-индексы по значениям полей для фильтров на равенство,
+    инвертированный индекс навык -> вакансии для фильтра 'Навыки', индексы по вилкам оклада для 'Оклад'
+    и индекс по дате публикации для диапазонов дат и сортировки по дате.
+    Индекс поля строится одним проходом при первом фильтре по этому полю и дальше переиспользуется,
+    поэтому повторные фильтры по тем же данным работают за время, пропорциональное размеру результата.
+    В индексах хранятся номера вакансий по возрастанию, поэтому результат идет в том же порядке, что и при переборе.
+    Attributes:
+        vacancies (list): Вакансии, по которым построены индексы
+        hash_indexes (dict): Для каждого параметра фильтрации словарь значение -> номера вакансий
+        skills_index (dict): Навык -> номера вакансий
+        skill_sets (dict): Навык -> множество номеров вакансий для проверки принадлежности
+        interval_indexes (dict): Для параметров с вилкой оклада индекс по отрезкам
+        dates (DateIndex): Индекс по дате публикации
+        sort_keys (SortKeys): Ключи сортировки по столбцам
+    """
+    index_keys = {
+        'Название региона': lambda vacancy: vacancy.area_name,
+        'Компания': lambda vacancy: vacancy.employer_name,
+        'Идентификатор валюты оклада': lambda vacancy: dic_currency_to_ru[vacancy.salary_currency],
+        'Опыт работы': lambda vacancy: vacancy.experience_id,
+        'Премиум-вакансия': lambda vacancy: vacancy.premium,
+        'Дата публикации вакансии': lambda vacancy: vacancy.published_at,
+    }
+    interval_keys = {
+        'Оклад': lambda vacancy: (vacancy.salary_from, vacancy.salary_to),
+        'Оклад в рублях': lambda vacancy: vacancy.salary_range_rub,
+    }
+
+    def __init__(self, vacancies):
+        """
+        Инициализирует объект VacancyIndex, сами индексы строятся по мере надобности.
+        Args:
+            vacancies (list): Вакансии
+        """
+        self.vacancies = vacancies
+        self.hash_indexes = {}
+        self.skills_index = None
+        self.skill_sets = None
+        self.interval_indexes = {}
+        self.dates = None
+        self.sort_keys = SortKeys(vacancies)
+
+    def supports(self, filter_name):
+        """
+        Проверяет, можно ли выполнить фильтр по индексу.
+        Args:
+            filter_name (str): Параметр фильтрации
+        Returns:
+            bool: Есть ли индекс для параметра
+        """
+        return filter_name in self.index_keys or filter_name in self.interval_keys or filter_name == 'Навыки'
+
+    def supports_range(self, filter_name):
+        """
+        Проверяет, можно ли выполнить фильтр по диапазону по индексу.
+        Args:
+            filter_name (str): Параметр фильтрации
+        Returns:
+            bool: Есть ли индекс для диапазона по параметру
+        """
+        return filter_name in self.interval_keys or filter_name == 'Дата публикации вакансии'
+
+    def build(self):
+        """
+        Строит сразу все индексы, например, перед серией фильтров.
+        """
+        for filter_name in self.index_keys:
+            self.hash_index(filter_name)
+        for filter_name in self.interval_keys:
+            self.interval_index(filter_name)
+        self.skill_index()
+        self.date_index()
+
+    def hash_index(self, filter_name):
+        """
+        Возвращает хеш-индекс для параметра фильтрации, при первом обращении строит его.
+        Args:
+            filter_name (str): Параметр фильтрации
+        Returns:
+            dict: Значение -> номера вакансий
+        """
+        if filter_name not in self.hash_indexes:
+            key, index = self.index_keys[filter_name], {}
+            for position, vacancy in enumerate(self.vacancies):
+                index.setdefault(key(vacancy), []).append(position)
+            self.hash_indexes[filter_name] = index
+        return self.hash_indexes[filter_name]
+
+    def interval_index(self, filter_name):
+        """
+        Возвращает индекс по вилкам оклада, при первом обращении строит его.
+        Args:
+            filter_name (str): Параметр фильтрации
+        Returns:
+            IntervalIndex: Индекс по отрезкам
+        """
+        if filter_name not in self.interval_indexes:
+            key = self.interval_keys[filter_name]
+            self.interval_indexes[filter_name] = IntervalIndex([key(vacancy) for vacancy in self.vacancies])
+        return self.interval_indexes[filter_name]
+
+    def date_index(self):
+        """
+        Возвращает индекс по дате публикации, при первом обращении строит его.
+        Returns:
+            DateIndex: Индекс по дате публикации
+        """
+        if self.dates is None:
+            self.dates = DateIndex([vacancy.published for vacancy in self.vacancies])
+        return self.dates
+
+    def skill_index(self):
+        """
+        Возвращает инвертированный индекс навыков, при первом обращении строит его вместе с множествами
+        номеров для каждого навыка.
+        Returns:
+            dict: Навык -> номера вакансий
+        """
+        if self.skills_index is None:
+            self.skills_index = {}
+            for position, vacancy in enumerate(self.vacancies):
+                for skill in set(vacancy.skills):
+                    self.skills_index.setdefault(skill, []).append(position)
+            self.skill_sets = {skill: set(positions) for skill, positions in self.skills_index.items()}
+        return self.skills_index
+
+    def lookup(self, filter_name, value):
+        """
+        Находит вакансии, подходящие под фильтр.
+        Args:
+            filter_name (str): Параметр фильтрации
+            value (str): Значение фильтра
+        Returns:
+            list: Вакансии в исходном порядке
+        """
+        return [self.vacancies[position] for position in self.positions(filter_name, value)]
+
+    def positions(self, filter_name, value):
+        """
+        Находит номера вакансий, подходящих под фильтр.
+        Для навыков номера из самого короткого списка проверяются по готовым множествам остальных навыков,
+        поэтому время зависит от размера самого короткого списка, а не от самых частых навыков.
+        Args:
+            filter_name (str): Параметр фильтрации
+            value (str): Значение фильтра
+        Returns:
+            list: Номера вакансий по возрастанию
+        """
+        if filter_name == 'Навыки':
+            index = self.skill_index()
+            skills = sorted(set(value.split(', ')), key=lambda skill: len(index.get(skill, [])))
+            positions = index.get(skills[0], [])
+            for skill in skills[1:]:
+                if not positions:
+                    break
+                posting = self.skill_sets.get(skill, ())
+                positions = [position for position in positions if position in posting]
+        elif filter_name in self.interval_keys:
+            positions = self.interval_index(filter_name).stab(float(value))
+        else:
+            positions = self.hash_index(filter_name).get(value, [])
+        return positions
+
+    def count(self, filter_name, value):
+        """
+        Оценивает количество вакансий, подходящих под фильтр, по размерам списков в индексе, не собирая номера.
+        Для навыков это размер самого короткого списка, то есть оценка сверху, для остальных параметров - точное число.
+        Args:
+            filter_name (str): Параметр фильтрации
+            value (str): Значение фильтра
+        Returns:
+            int: Количество вакансий
+        """
+        if filter_name == 'Навыки':
+            index = self.skill_index()
+            return min(len(index.get(skill, [])) for skill in set(value.split(', ')))
+        if filter_name in self.interval_keys:
+            return self.interval_index(filter_name).count_containing(float(value))
+        return len(self.hash_index(filter_name).get(value, []))
+
+    def range_count(self, filter_name, low, high):
+        """
+        Оценивает количество вакансий, подходящих под фильтр по диапазону, бинарным поиском в индексе.
+        Args:
+            filter_name (str): Параметр фильтрации
+            low: Нижняя граница или None
+            high: Верхняя граница или None
+        Returns:
+            int: Количество вакансий
+        """
+        if filter_name == 'Дата публикации вакансии':
+            return self.date_index().count_between(low, high)
+        return self.interval_index(filter_name).count_overlap(low, high)
+
+    def range_positions(self, filter_name, low, high):
+        """
+        Находит номера вакансий, подходящих под фильтр по диапазону.
+        Args:
+            filter_name (str): Параметр фильтрации
+            low: Нижняя граница или None
+            high: Верхняя граница или None
+        Returns:
+            list: Номера вакансий по возрастанию
+        """
+        if filter_name == 'Дата публикации вакансии':
+            return self.date_index().between(low, high)
+        return self.interval_index(filter_name).overlap(low, high)
+
+
+class PlanStep:
+    """
+    Шаг плана фильтрации для одного узла выражения.
+    Attributes:
+        node: Узел выражения фильтрации
+        children (list): Шаги дочерних узлов в порядке проверки
+        driver (PlanStep): Для AND - дочерний шаг, который выполняется по индексу
+        lookup (function): Для условия, которое можно выполнить по индексу, - поиск номеров подходящих вакансий
+        positions (list): Номера подходящих вакансий, когда условие выполнено по индексу
+        selectivity (float): Оценка доли вакансий, которые проходят условие
+        cost (float): Оценка стоимости проверки одной вакансии
+        predicate (function): Проверка одной вакансии
+        access (str): Как выполняется шаг: по индексу или проверкой каждой вакансии
+    """
+    def __init__(self, node, selectivity, cost, predicate, children=(), driver=None, lookup=None):
+        self.node = node
+        self.selectivity = selectivity
+        self.cost = cost
+        self.predicate = predicate
+        self.children = list(children)
+        self.driver = driver
+        self.lookup = lookup
+        self.positions = None
+        self.access = 'проверка'
+
+
+class QueryPlan:
+    """
+    План выполнения выражения фильтрации.
+    Для каждого узла оценивается доля вакансий, которые его пройдут, и стоимость проверки одной вакансии.
+    В AND условия проверяются по возрастанию cost / (1 - доля): сначала дешевые и отсекающие больше вакансий,
+    дорогая проверка навыков - в конце. В OR - по возрастанию cost / доля.
+    Если вакансии загружены и для них есть индекс, доли условий считаются по размерам списков индекса
+    и бинарному поиску в нем, не собирая номера вакансий. AND начинается с самого избирательного условия,
+    которое можно выполнить по индексу, номера вакансий собираются только для него, а остальные условия
+    проверяются для найденных им вакансий. Без индекса доли берутся по умолчанию.
+    Attributes:
+        expression: Выражение фильтрации
+        index (VacancyIndex): Индексы по вакансиям или None
+        total (int): Количество вакансий, если оно известно
+        root (PlanStep): Шаг для всего выражения
+        use_index (bool): Выполняется ли выражение по индексу
+    """
+    predicate_costs = {
+        'Название региона': 1,
+        'Компания': 1,
+        'Идентификатор валюты оклада': 2,
+        'Опыт работы': 2,
+        'Премиум-вакансия': 2,
+        'Дата публикации вакансии': 3,
+        'Оклад': 4,
+        'Оклад в рублях': 5,
+        'Название': 5,
+        'Навыки': 10,
+    }
+    equality_selectivity = 0.1
+    range_selectivity = 0.3
+
+    def __init__(self, expression, index=None):
+        """
+        Инициализирует объект QueryPlan и выбирает порядок выполнения условий.
+        Args:
+            expression: Выражение фильтрации
+            index (VacancyIndex): Индексы по вакансиям, которые будут фильтроваться, или None
+        """
+        self.expression = expression
+        self.index = index
+        self.total = len(index.vacancies) if index is not None else None
+        self.root = self.plan(expression)
+        self.use_index = self.indexed(self.root)
+        if self.use_index:
+            self.mark_index(self.root)
+
+    @property
+    def predicate(self):
+        return self.root.predicate
+
+    def plan(self, node):
+        """
+        Строит шаг плана для узла выражения.
+        Args:
+            node: Узел выражения фильтрации
+        Returns:
+            PlanStep: Шаг плана
+        """
+        if isinstance(node, filter_expression.Condition):
+            return self.plan_condition(node)
+        if isinstance(node, filter_expression.Not):
+            child = self.plan(node.child)
+            return PlanStep(node, 1 - child.selectivity, child.cost, lambda vacancy: not child.predicate(vacancy),
+                            [child])
+        children = [self.plan(child) for child in node.children]
+        if isinstance(node, filter_expression.Or):
+            children.sort(key=lambda step: step.cost / max(step.selectivity, 1e-9))
+            passed, cost, predicates = 1, 0, [step.predicate for step in children]
+            for step in children:
+                cost += passed * step.cost
+                passed *= 1 - step.selectivity
+            return PlanStep(node, 1 - passed, cost, lambda vacancy: any(check(vacancy) for check in predicates),
+                            children)
+        children.sort(key=lambda step: step.cost / max(1 - step.selectivity, 1e-9))
+        driver = min((step for step in children if self.indexed(step)), key=lambda step: step.selectivity,
+                     default=None)
+        passed, cost, predicates = 1, 0, [step.predicate for step in children]
+        for step in children:
+            cost += passed * step.cost
+            passed *= step.selectivity
+        if driver is not None:
+            children.remove(driver)
+            children.insert(0, driver)
+        return PlanStep(node, passed, cost, lambda vacancy: all(check(vacancy) for check in predicates),
+                        children, driver)
+
+    def plan_condition(self, condition):
+        """
+        Строит шаг плана для условия на один параметр.
+        Args:
+            condition (Condition): Условие
+        Returns:
+            PlanStep: Шаг плана
+        """
+        key, cost = condition.key, self.predicate_costs[condition.key]
+        if condition.is_range:
+            check, low, high = DataSet.cond_to_range[key], condition.low, condition.high
+            predicate = lambda vacancy: check(vacancy, low, high)
+            if self.index is None or not self.index.supports_range(key):
+                return PlanStep(condition, self.range_selectivity, cost, predicate)
+            index = self.index
+            return PlanStep(condition, index.range_count(key, low, high) / max(self.total, 1), cost, predicate,
+                            lookup=lambda: index.range_positions(key, low, high))
+        check, values = DataSet.cond_to_sort[key], condition.values
+        if len(values) == 1:
+            value = values[0]
+            predicate = lambda vacancy: check(vacancy, value)
+        else:
+            predicate = lambda vacancy: any(check(vacancy, value) for value in values)
+        if self.index is None or not self.index.supports(key):
+            return PlanStep(condition, min(self.equality_selectivity * len(values), 1), cost * len(values),
+                            predicate)
+        index = self.index
+        count = min(sum(index.count(key, value) for value in values), self.total)
+        lookup = (lambda: index.positions(key, values[0])) if len(values) == 1 else (
+            lambda: sorted(set().union(*(index.positions(key, value) for value in values))))
+        return PlanStep(condition, count / max(self.total, 1), cost * len(values), predicate, lookup=lookup)
+
+    def indexed(self, step):
+        """
+        Проверяет, можно ли выполнить шаг по индексу.
+        Args:
+            step (PlanStep): Шаг плана
+        Returns:
+            bool: Можно ли выполнить шаг по индексу
+        """
+        if isinstance(step.node, filter_expression.Condition):
+            return step.lookup is not None
+        if isinstance(step.node, filter_expression.Or):
+            return all(self.indexed(child) for child in step.children)
+        return step.driver is not None
+
+    def mark_index(self, step):
+        step.access = 'индекс'
+        for child in step.children if isinstance(step.node, filter_expression.Or) else [step.driver] * bool(step.driver):
+            self.mark_index(child)
+
+    def select(self, step=None):
+        """
+        Выполняет шаг по индексу. Номера вакансий собираются только для условий, которые выполняются по индексу:
+        ведущего условия AND и условий OR, остальные условия проверяются для найденных вакансий.
+        Args:
+            step (PlanStep): Шаг плана, по умолчанию все выражение
+        Returns:
+            list: Номера подходящих вакансий по возрастанию
+        """
+        step = step or self.root
+        if isinstance(step.node, filter_expression.Condition):
+            if step.positions is None:
+                step.positions = step.lookup()
+            return step.positions
+        if isinstance(step.node, filter_expression.Or):
+            return sorted(set().union(*(self.select(child) for child in step.children)))
+        checks = [child.predicate for child in step.children[1:]]
+        return [position for position in self.select(step.driver)
+                if all(check(self.index.vacancies[position]) for check in checks)]
+
+    def explain(self):
+        """
+        Описывает выбранный план: порядок условий, способ выполнения, оценки доли и стоимости.
+        Returns:
+            list: Строки описания
+        """
+        lines = ['План фильтрации: {0}'.format(self.expression)]
+        if self.total is not None:
+            lines.append('Вакансий: {0}, ожидается после фильтрации: {1}'.format(
+                self.total, round(self.root.selectivity * self.total)))
+        self.describe(self.root, 1, lines, len(lines))
+        return lines
+
+    def describe(self, step, depth, lines, offset):
+        if isinstance(step.node, filter_expression.Condition):
+            name = str(step.node)
+        elif isinstance(step.node, filter_expression.Not):
+            name = 'NOT'
+        else:
+            name = step.node.operator
+        lines.append('{0}{1}. {2} {3}: доля {4:.1%}, стоимость {5:g}'.format(
+            '  ' * depth, len(lines) - offset + 1, step.access, name, step.selectivity, round(step.cost, 2)))
+        for child in step.children:
+            self.describe(child, depth + 1, lines, offset)
+
+
 class DataSet:
     """
     Считывает и обрабатывает данные из csv файла.
     Attributes:
         file_name (str): Название файла
-        filter_param (str): Параметр фильтрации
+        filter_param: Выражение фильтрации или пара [параметр, значение]
         sort_param (str): Параметр сортировки
         sort_reverse (str): Порядок сортировки
         sort_range (str): Диапазон вывода
-        vacancies_objects (list): Лист с вакансиями
+        vacancies_objects (list): Лист с вакансиями или, при потоковом чтении, итератор по ним
+        header (list): Заголовок csv файла
+        index (VacancyIndex): Индексы по всем считанным вакансиям
+        selection (tuple): Текущий лист вакансий и номера этих вакансий в индексе (None - все)
+        plan (QueryPlan): План последней фильтрации
         cond_to_sort (dict): Словарь с характеристиками для вакансии для сортировки
+        cond_to_range (dict): Проверки диапазонов для параметров, у которых они есть
+        range_bounds (dict): Перевод границ диапазонов из ввода пользователя
     """
     def __init__(self, file_name, filter_param, sort_param, sort_reverse, sort_range):
         self.file_name = file_name
@@ -229,6 +1116,10 @@ class DataSet:
         self.sort_reverse = sort_reverse
         self.sort_range = sort_range
         self.vacancies_objects = []
+        self.header = []
+        self.index = None
+        self.selection = None
+        self.plan = None
 
     cond_to_sort = {
         'Навыки': lambda vacancy, value: all([skill in vacancy.skills for skill in value.split(', ')]),
@@ -239,30 +1130,60 @@ class DataSet:
         'Дата публикации вакансии': lambda vacancy, value: vacancy.published_at == value,
         'Опыт работы': lambda vacancy, value: vacancy.experience_id == value,
         'Премиум-вакансия': lambda vacancy, value: vacancy.premium == value,
-        'Компания': lambda vacancy, value: vacancy.employer_name == value
+        'Компания': lambda vacancy, value: vacancy.employer_name == value,
+        'Оклад в рублях': lambda vacancy, value: IntervalIndex.overlaps(vacancy.salary_range_rub, float(value),
+                                                                        float(value)),
+    }
+    cond_to_range = {
+        'Оклад': lambda vacancy, low, high: ((low is None or vacancy.salary_to >= low)
+                                             and (high is None or vacancy.salary_from <= high)),
+        'Оклад в рублях': lambda vacancy, low, high: IntervalIndex.overlaps(vacancy.salary_range_rub, low, high),
+        'Дата публикации вакансии': lambda vacancy, low, high: ((low is None or vacancy.published[:10] >= low)
+                                                                and (high is None or vacancy.published[:10] <= high)),
+    }
+    range_bounds = {
+        'Оклад': float,
+        'Оклад в рублях': float,
+        'Дата публикации вакансии': DateIndex.parse_bound,
     }
 
-    def csv_reader(self):
+    def read_vacancies(self):
         """
-        Считывает csv файл и записывает данные в лист.
+        Построчно считывает csv файл, не держа его в памяти целиком.
+        Строки с пустыми полями и неполные строки пропускаются.
         Returns:
-            list: Данные из csv файла в виде словарей хранящихся в листе
+            generator: Вакансии в порядке следования в файле
         """
-        header = []
         with open(self.file_name, mode='r', encoding='utf-8-sig') as file:
             reader = csv.reader(file)
-            for index, row in enumerate(reader):
-                if index == 0:
-                    header = row
-                    csv_header_length = len(row)
-                elif '' not in row and len(row) == csv_header_length:
-                    self.vacancies_objects.append(Vacancy(dict(zip(header, row))))
-        if len(self.vacancies_objects) == 0:
-            if len(header) == 0:
+            self.header = next(reader, [])
+            for row in reader:
+                if '' not in row and len(row) == len(self.header):
+                    yield Vacancy(dict(zip(self.header, row)))
+
+    def csv_reader(self, stream=False):
+        """
+        Считывает csv файл и записывает данные в лист.
+        С stream=True вакансии не загружаются, а считываются по мере надобности следующими шагами:
+        фильтрация и диапазон вывода обрабатывают их по одной, в памяти копятся только отфильтрованные вакансии
+        для сортировки, и чтение файла прекращается, как только набран диапазон вывода.
+        Args:
+            stream (bool): Считывать вакансии по мере надобности вместо загрузки всего файла
+        """
+        vacancies = self.read_vacancies()
+        first = next(vacancies, None)
+        if first is None:
+            if len(self.header) == 0:
                 print('Пустой файл')
             else:
                 print('Нет данных')
             exit()
+        if stream:
+            self.vacancies_objects = itertools.chain([first], vacancies)
+            return
+        self.vacancies_objects = [first] + list(vacancies)
+        self.index = VacancyIndex(self.vacancies_objects)
+        self.selection = (self.vacancies_objects, None)
 
     def get_rows(self):
         """
@@ -278,34 +1199,143 @@ class DataSet:
         Returns:
             list: Данные вакансий
         """
-        vacancies_temp = []
-        length = len(self.sort_range)
-        for index, vacancy in enumerate(self.vacancies_objects):
-            if (length > 1 and self.sort_range[0] <= index < self.sort_range[1]) or (
-                    length == 1 and self.sort_range[0] <= index) or length == 0:
-                vacancy.index = index + 1
-                vacancies_temp.append(vacancy)
-        self.vacancies_objects = vacancies_temp
+        start = max(self.sort_range[0], 0) if self.sort_range else 0
+        end = self.range_limit()
+        if not isinstance(self.vacancies_objects, list):
+            self.vacancies_objects = self.numbered(
+                itertools.islice(self.vacancies_objects, start, end) if end is None or start < end else [], start + 1)
+            return
+        self.vacancies_objects = self.vacancies_objects[start:end]
+        for index, vacancy in enumerate(self.vacancies_objects, start + 1):
+            vacancy.index = index
+
+    @staticmethod
+    def numbered(vacancies, start):
+        """
+        Нумерует вакансии по мере их считывания.
+        Args:
+            vacancies (iterable): Вакансии
+            start (int): Номер первой вакансии
+        Returns:
+            generator: Те же вакансии с заполненным index
+        """
+        for index, vacancy in enumerate(vacancies, start):
+            vacancy.index = index
+            yield vacancy
+
+    def range_limit(self):
+        """
+        Находит, сколько первых вакансий после сортировки нужно для диапазона вывода.
+        Returns:
+            int: Количество вакансий или None, если верхняя граница диапазона не задана
+        """
+        return max(self.sort_range[1], 0) if len(self.sort_range) > 1 else None
+
+    def sort_columns(self):
+        """
+        Разбирает параметр сортировки: один или несколько столбцов через запятую, например
+        'Название региона, Оклад DESC, Дата публикации вакансии DESC'. Обратный порядок сортировки
+        меняет направление каждого столбца.
+        Returns:
+            list: Пары (характеристика вакансии, по убыванию) от главного столбца к второстепенным
+        """
+        columns = []
+        for column in filter(None, self.sort_param.split(', ')):
+            name, direction = column.rsplit(' ', 1) if column.endswith((' ASC', ' DESC')) else (column, 'ASC')
+            columns.append((dic_rus_names[name], (direction == 'DESC') != self.sort_reverse))
+        return columns
 
     def sort_rows(self):
         """
         Сортирует вакансии по в нужном порядке сортировки.
+        Если у диапазона вывода есть верхняя граница, полная сортировка не нужна: первые limit вакансий
+        выбираются кучей ограниченного размера за O(n log limit). heapq.nsmallest и heapq.nlargest
+        устойчивы так же, как sort, поэтому порядок вакансий с одинаковым ключом не меняется.
+        При потоковом чтении это единственный шаг, которому нужны все отфильтрованные вакансии сразу,
+        а с верхней границей диапазона в памяти держится не больше limit вакансий.
+        Загруженные вакансии по дате публикации не сортируются, а берутся в готовом порядке DateIndex,
+        а по другим столбцам сортируются номера вакансий по ключам SortKeys, посчитанным один раз.
+        Без индекса при сортировке по нескольким столбцам ключ каждого столбца считается один раз на вакансию,
+        и вакансии сортируются устойчиво от последнего столбца к первому.
         """
-        if self.sort_param != '':
-            self.vacancies_objects.sort(key=lambda a: getattr(a, dic_rus_names[self.sort_param]),
-                                        reverse=self.sort_reverse)
-        elif self.sort_param == '' and self.sort_reverse:
-            self.vacancies_objects.reverse()
+        limit = self.range_limit()
+        loaded = isinstance(self.vacancies_objects, list)
+        columns = self.sort_columns()
+        if columns and self.selection is not None and self.selection[0] is self.vacancies_objects:
+            if len(columns) == 1 and columns[0][0] == 'published':
+                positions = self.index.date_index().sort(self.selection[1], columns[0][1], limit)
+            else:
+                positions = self.index.sort_keys.argsort(self.selection[1], columns, limit)
+            self.vacancies_objects = [self.index.vacancies[position] for position in positions]
+        elif len(columns) == 1:
+            attribute, reverse = columns[0]
+            key = lambda a: getattr(a, attribute)
+            if limit is not None and (not loaded or limit * 10 < len(self.vacancies_objects)):
+                select = heapq.nlargest if reverse else heapq.nsmallest
+                self.vacancies_objects = select(limit, self.vacancies_objects, key=key)
+            else:
+                self.vacancies_objects = sorted(self.vacancies_objects, key=key, reverse=reverse)
+        elif columns:
+            vacancies = list(self.vacancies_objects)
+            for attribute, reverse in reversed(columns):
+                keys = [getattr(vacancy, attribute) for vacancy in vacancies]
+                vacancies = [vacancies[i] for i in sorted(range(len(vacancies)), key=keys.__getitem__,
+                                                          reverse=reverse)]
+            self.vacancies_objects = vacancies[:limit]
+        elif self.sort_reverse:
+            if loaded:
+                self.vacancies_objects = self.vacancies_objects[::-1][:limit]
+            else:
+                self.vacancies_objects = list(reversed(deque(self.vacancies_objects, maxlen=limit)))
 
     def filter_rows(self):
         """
         Фильтрует вакансии по заданным параметрам.
+        Порядок проверки условий выбирает QueryPlan. Пока вакансии не отфильтрованы, условия на равенство
+        и по навыкам выполняются по индексу. При потоковом чтении вакансии фильтруются по одной по мере считывания.
         """
-        if len(self.filter_param) == 0:
+        if not self.filter_param:
+            return
+        expression = self.filter_param
+        if isinstance(expression, list):
+            expression = filter_expression.Condition(expression[0], [expression[1]])
+        index = self.index if self.index is not None and self.vacancies_objects is self.index.vacancies else None
+        self.plan = QueryPlan(expression, index)
+        if index is not None:
+            positions = self.plan.select() if self.plan.use_index else [
+                position for position, vacancy in enumerate(self.vacancies_objects) if self.plan.predicate(vacancy)]
+            self.vacancies_objects = [self.vacancies_objects[position] for position in positions]
+            self.selection = (self.vacancies_objects, positions)
             return
-        self.vacancies_objects = list(
-            filter(lambda vacancy: self.cond_to_sort[self.filter_param[0]](vacancy, self.filter_param[1]),
-                   self.vacancies_objects))
+        vacancies = filter(self.plan.predicate, self.vacancies_objects)
+        self.vacancies_objects = list(vacancies) if isinstance(self.vacancies_objects, list) else vacancies
+
+    def query(self, filter_param, sort_param='', sort_reverse=False, sort_range=()):
+        """
+        Выполняет один запрос по загруженным вакансиям: фильтрация и сортировка по индексам, затем диапазон вывода.
+        Каждый запрос начинается со всех вакансий index.vacancies и не меняет их, поэтому индексы и ключи
+        сортировки, построенные для одного запроса, переиспользуются следующими.
+        Args:
+            filter_param: Выражение фильтрации, пара [параметр, значение] или пустой лист
+            sort_param (str): Параметр сортировки
+            sort_reverse (bool): Обратный порядок сортировки
+            sort_range (list): Диапазон вывода
+        Returns:
+            list: Вакансии запроса с номерами в диапазоне вывода
+        """
+        if self.index is None:
+            self.csv_reader()
+        self.filter_param = filter_param
+        self.sort_param = sort_param
+        self.sort_reverse = sort_reverse
+        self.sort_range = sort_range
+        self.vacancies_objects = self.index.vacancies
+        self.selection = (self.vacancies_objects, None)
+        self.plan = None
+        self.filter_rows()
+        self.sort_rows()
+        self.get_range()
+        return self.vacancies_objects
 
 
 class InputConnect:
@@ -314,32 +1344,86 @@ class InputConnect:
     Attributes:
         errors (list): Лист с названиями характеристик для вакансии
         file_name (str): Название файла
-        filter_param (str): Параметр фильтрации
+        filter_param: Выражение фильтрации
+        explain (bool): Вывести план фильтрации перед таблицей
         sort_param (str): Параметр сортировки
         sort_reverse (str): Порядок сортировки
         sort_range (str): Диапазон вывода
         table_fields (str): Столбцы которые нужно вывести в консоль
     """
-    def __init__(self):
+    def __init__(self, indexed=False):
         """
         Инициализирует класс, выводит таблицу в консоль.
+        С indexed=True файл загружается один раз с индексами, и запросы вводятся один за другим,
+        пока пользователь не откажется от следующего запроса или не закончится ввод.
+        Args:
+            indexed (bool): Загрузить файл и выполнять по нему несколько запросов
         """
-        self.errors = []
         self.file_name = input('Введите название файла: ')
-        self.filter_param = self.parse_filter_param(input('Введите параметр фильтрации: '))
-        self.sort_param = self.parse_sort_param(input('Введите параметр сортировки: '))
-        self.sort_reverse = self.parse_sort_reverse(input('Обратный порядок сортировки (Да / Нет): '))
-        self.sort_range = self.parse_sort_range(input('Введите диапазон вывода: '))
-        self.table_fields = self.parse_table_fields(input('Введите требуемые столбцы: '))
+        if indexed:
+            self.run_queries()
+            return
+        self.read_query()
         if len(self.errors) != 0:
             print(self.errors[0])
             exit()
         data_set = DataSet(self.file_name, self.filter_param, self.sort_param, self.sort_reverse, self.sort_range)
-        data_set.csv_reader()
+        data_set.csv_reader(stream=True)
         data_set.filter_rows()
+        if self.explain and data_set.plan is not None:
+            print('\n'.join(data_set.plan.explain()))
         data_set.sort_rows()
         data_set.get_range()
-        rows = data_set.get_rows()
+        self.print_table(data_set.vacancies_objects)
+
+    table_header = ['№', 'Название', 'Описание', 'Навыки', 'Опыт работы', 'Премиум-вакансия', 'Компания', 'Оклад',
+                    'Название региона', 'Дата публикации вакансии']
+
+    def read_query(self):
+        """
+        Считывает параметры одного запроса, ошибки ввода записываются в errors.
+        """
+        self.errors = []
+        self.explain = False
+        self.filter_param = self.parse_filter_param(input('Введите параметр фильтрации: '))
+        self.sort_param = self.parse_sort_param(input('Введите параметр сортировки: '))
+        self.sort_reverse = self.parse_sort_reverse(input('Обратный порядок сортировки (Да / Нет): '))
+        self.sort_range = self.parse_sort_range(input('Введите диапазон вывода: '))
+        self.table_fields = self.parse_table_fields(input('Введите требуемые столбцы: '))
+
+    def run_queries(self):
+        """
+        Загружает файл с индексами и выполняет запросы через DataSet.query. Индексы строятся при первом
+        запросе, которому они нужны, и переиспользуются следующими запросами. Ошибка ввода
+        выводится, и запрос пропускается без выхода из программы.
+        """
+        data_set = DataSet(self.file_name, [], '', False, [])
+        data_set.csv_reader()
+        while True:
+            try:
+                self.read_query()
+            except EOFError:
+                return
+            if len(self.errors) != 0:
+                print(self.errors[0])
+            else:
+                vacancies = data_set.query(self.filter_param, self.sort_param, self.sort_reverse, self.sort_range)
+                if self.explain and data_set.plan is not None:
+                    print('\n'.join(data_set.plan.explain()))
+                self.print_table(vacancies)
+            try:
+                if input('Выполнить еще запрос (Да / Нет): ') != 'Да':
+                    return
+            except EOFError:
+                return
+
+    def print_table(self, vacancies):
+        """
+        Выводит вакансии в консоль таблицей.
+        Args:
+            vacancies (iterable): Вакансии с номерами
+        """
+        rows = [vacancy.get_list() for vacancy in vacancies]
         if len(rows) == 0:
             print('Ничего не найдено')
         else:
@@ -347,25 +1431,25 @@ class InputConnect:
             table.add_rows(rows)
             print(table.get_string(fields=self.table_fields))
 
-    table_header = ['№', 'Название', 'Описание', 'Навыки', 'Опыт работы', 'Премиум-вакансия', 'Компания', 'Оклад',
-                    'Название региона', 'Дата публикации вакансии']
-
     def parse_filter_param(self, filter_param):
         """
         Обрабатывает ввод пользователя для параметра фильтрации и выводит ошибку, если данные введены неверно.
+        Кроме одного условия 'Ключ: значение' принимает выражения из условий с AND, OR, NOT и скобками,
+        списки 'Ключ IN (значение, значение)' и диапазоны 'Оклад: от..до', 'Дата публикации вакансии: от..до'.
+        С префиксом 'EXPLAIN ' перед таблицей выводится план фильтрации.
         Returns:
-            list: Параметры фильтрации
+            Выражение фильтрации или пустой лист, если фильтр не задан
         """
         if filter_param == '':
             return []
-        if ': ' not in filter_param:
-            self.errors.append('Формат ввода некорректен')
-            return []
-        filter_param = filter_param.split(': ')
-        if filter_param[0] not in list(DataSet.cond_to_sort.keys()):
-            self.errors.append('Параметр поиска некорректен')
+        if filter_param.startswith('EXPLAIN '):
+            self.explain = True
+            filter_param = filter_param[len('EXPLAIN '):]
+        try:
+            return filter_expression.parse(filter_param, DataSet.cond_to_sort, DataSet.range_bounds)
+        except filter_expression.FilterSyntaxError as error:
+            self.errors.append(str(error))
             return []
-        return filter_param
 
     def parse_sort_reverse(self, sort_reverse):
         """
@@ -380,11 +1464,16 @@ class InputConnect:
     def parse_sort_param(self, sort_param):
         """
         Обрабатывает ввод пользователя для параметра сортировки и выводит ошибку, если данные введены неверно.
+        Можно указать несколько столбцов через запятую, у каждого - направление ASC или DESC.
         Returns:
-            list: Параметры сортировки
+            str: Параметры сортировки
         """
-        if sort_param not in InputConnect.table_header + ['']:
-            self.errors.append('Параметр сортировки некорректен')
+        for column in sort_param.split(', ') if sort_param else []:
+            if column.endswith((' ASC', ' DESC')):
+                column = column.rsplit(' ', 1)[0]
+            if column not in InputConnect.table_header:
+                self.errors.append('Параметр сортировки некорректен')
+                break
         return sort_param
 
     @staticmethod
@@ -407,10 +1496,19 @@ class InputConnect:
         return [] if sort_range == '' else [int(limit) - 1 for limit in sort_range.split()]
 
 
-def get_table():
+def get_table(indexed=False):
     """
     Запускает программу.
+    Args:
+        indexed (bool): Загрузить файл с индексами и выполнять по нему запросы один за другим
     """
-    InputConnect()
+    InputConnect(indexed)
+
+
+if __name__ == '__main__':
+    import argparse
 
-get_table()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Таблица вакансий из csv файла')
+    parser.add_argument('--indexed', action='store_true',
+                        help='загрузить файл один раз и выполнять по нему несколько запросов по индексам')
+    get_table(parser.parse_args().indexed)
@@ -0,0 +1,51 @@
+import functools
+import re
+
+TAG_PATTERN = re.compile(r'<.*?>')
+CACHE_SIZE = 1 << 16
+
+
+def strip_html(text):
+    """
+    Удаляет html теги и лишние пробелы из строки.
+    Результат совпадает с re.sub(r'<.*?>', '', text), затем re.sub(r'\\s+', ' ', ...).strip():
+    теги удаляются скомпилированным шаблоном (тег, как и раньше, не может содержать перевод строки),
+    а пробелы схлопываются через str.split, который считает пробельными те же символы, что и \\s.
+    Строки без '<' не проходят через регулярное выражение совсем.
+    Args:
+        text (str): Строка
+    Returns:
+        str: Строку без html тегов и лишних пробелов
+    """
+    if '<' in text:
+        text = TAG_PATTERN.sub('', text)
+    return ' '.join(text.split())
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def clean_html(text):
+    """
+    То же, что strip_html, но запоминает результат для повторяющихся строк (названия, шаблонные описания).
+    Args:
+        text (str): Строка
+    Returns:
+        str: Строку без html тегов и лишних пробелов
+    """
+    return strip_html(text)
+
+
+def clean_batch(texts):
+    """
+    Очищает сразу целый столбец строк, каждая уникальная строка очищается один раз.
+    Args:
+        texts (iterable): Строки
+    Returns:
+        list: Очищенные строки в том же порядке
+    """
+    cleaned = {}
+    result = []
+    for text in texts:
+        if text not in cleaned:
+            cleaned[text] = strip_html(text)
+        result.append(cleaned[text])
+    return result
@@ -1,13 +1,24 @@
-import table_5_2
-import pdf_2_1_3
+def main(args=None):
+    import argparse
 
-
-def main():
+    # Модули отчетов импортируются только в своей ветке: для таблицы вакансий
+    # не нужны openpyxl, matplotlib, numpy, jinja2 и pdfkit.
+    # Аргументы, кроме --indexed, передаются отчету статистики (см. pdf_2_1_3.main).
+    parser = argparse.ArgumentParser(description='Таблица вакансий или статистика по вакансиям')
+    parser.add_argument('--indexed', action='store_true',
+                        help='таблица вакансий: загрузить файл один раз и выполнять по нему несколько запросов')
+    arguments, report_args = parser.parse_known_args(args)
     type_out = input('Введите вид формирования данных: ')
     if type_out == 'Вакансии':
-        table_5_2.get_table()
+        if report_args:
+            parser.error('аргументы {0} относятся только к статистике'.format(' '.join(report_args)))
+        import table_5_2
+        table_5_2.get_table(arguments.indexed)
     elif type_out == 'Статистика':
-        pdf_2_1_3.get_pdf()
+        if arguments.indexed:
+            parser.error('--indexed относится только к таблице вакансий')
+        import pdf_2_1_3
+        pdf_2_1_3.main(report_args)
     else:
         print('Неверный ввод! (main)')
 
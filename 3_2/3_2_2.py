@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
+import json
+import os
+import sys
 import pandas as pd
 from multiprocessing import Process, Queue
 import cProfile
 
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '2_1'))
+import frame_cache
+
 class UserInput:
     def __init__(self):
         self.file_name = input('Введите название файла: ')
@@ -27,25 +33,61 @@ class Multithreading:
         queue.put([salary_by_years, vacs_by_years, vac_salary_by_years, vac_counts_by_years])
 
 
+def read_vacancies(file_name):
+    dataframe = pd.read_csv(file_name)
+    dataframe['years'] = dataframe['published_at'].apply(lambda date: int(date[:4]))
+    return dataframe
+
+
 class SplitData:
-    def __init__(self, file_name):
-        self.dataframe = pd.read_csv(file_name)
+    parts_marker = 'new_csv_files\\.source'
 
-        self.dataframe['years'] = self.dataframe['published_at'].apply(lambda date: int(date[:4]))
+    def __init__(self, file_name):
+        self.dataframe, fingerprint = frame_cache.load_frame(file_name, read_vacancies)
         self.years = list(self.dataframe['years'].unique())
 
+        if not self.parts_current(fingerprint):
+            if os.path.exists(self.parts_marker):
+                os.remove(self.parts_marker)
+            for year in self.years:
+                data = self.dataframe[self.dataframe['years'] == year]
+                data.iloc[:, :6].to_csv(self.part_file(year), index=False)
+            temp = self.parts_marker + '.tmp'
+            with open(temp, 'w') as marker:
+                json.dump({'source': fingerprint, 'parts': self.parts_versions()}, marker)
+            os.replace(temp, self.parts_marker)
+
+    @staticmethod
+    def part_file(year):
+        return rf'new_csv_files\part_{year}.csv'
+
+    def parts_versions(self):
+        versions = {}
         for year in self.years:
-            data = self.dataframe[self.dataframe['years'] == year]
-            data.iloc[:, :6].to_csv(rf'new_csv_files\part_{year}.csv', index=False)
+            if not os.path.exists(self.part_file(year)):
+                return None
+            stat = os.stat(self.part_file(year))
+            versions[str(year)] = [stat.st_size, stat.st_mtime_ns]
+        return versions
 
+    def parts_current(self, fingerprint):
+        try:
+            with open(self.parts_marker) as marker:
+                parts = json.load(marker)
+        except (OSError, ValueError):
+            return False
+        return parts.get('source') == fingerprint and parts.get('parts') == self.parts_versions()
 
-if __name__ == '__main__':
-    pr = cProfile.Profile()
-    pr.enable()
-    pd.set_option('expand_frame_repr', False)
 
-    user_input = UserInput()
-    file, vacancy = user_input.file_name, user_input.vacancy_name
+def dict_sort(dictionary):
+    return dict(sorted(dictionary.items(), key=lambda item: item[1]))
+
+
+def area_dict_sort(dictionary):
+    return {key: value for key, value in sorted(dictionary.items(), key=lambda item: item[1], reverse=True)[:10]}
+
+
+def get_statistic(file, vacancy):
     csvs = SplitData(file)
     df, years = csvs.dataframe, csvs.years
 
@@ -81,11 +123,17 @@ if __name__ == '__main__':
         vacancies_count.update(dicts_list[3])
         proces.join()
 
-    def dict_sort(dictionary):
-        return dict(sorted(dictionary.items(), key=lambda item: item[1]))
+    return salaries_by_year, vacancies_by_year, vacancies_salary, vacancies_count, salaries_areas, vacancies_areas
+
+
+if __name__ == '__main__':
+    pr = cProfile.Profile()
+    pr.enable()
+    pd.set_option('expand_frame_repr', False)
 
-    def area_dict_sort(dictionary):
-        return {key: value for key, value in sorted(dictionary.items(), key=lambda item: item[1], reverse=True)[:10]}
+    user_input = UserInput()
+    salaries_by_year, vacancies_by_year, vacancies_salary, vacancies_count, salaries_areas, vacancies_areas = \
+        get_statistic(user_input.file_name, user_input.vacancy_name)
 
     print('Динамика уровня зарплат по годам:', dict_sort(salaries_by_year))
     print('Динамика количества вакансий по годам:', dict_sort(vacancies_by_year))
@@ -0,0 +1,36 @@
+import math
+import os
+from concurrent import futures
+
+SMALL_YEAR_ROWS = 20000
+
+
+def year_statistics(run, vacancy, year_rows, workers=None, small_year_rows=SMALL_YEAR_ROWS):
+    """
+    Считает статистику каждого года (3_2_3, 3_4_2) в пуле процессов.
+    Все годы отправляются в пул сразу: большие по одному, от самого большого к меньшим, и собираются
+    по мере готовности через as_completed, а маленькие годы идут через map пачками, чтобы на каждый
+    не тратить отдельную пересылку задачи в процесс. При одном процессе годы считаются без пула.
+    Args:
+        run (function): Функция, которая считает статистику по паре (профессия, год)
+        vacancy (str): Название профессии
+        year_rows (dict): Год -> количество вакансий
+        workers (int): Количество процессов, по умолчанию по числу процессоров, но не больше числа лет
+        small_year_rows (int): Годы меньше этого размера обрабатываются пачками через map
+    Returns:
+        dict: Год -> результат run
+    """
+    workers = workers or min(os.cpu_count() or 1, max(len(year_rows), 1))
+    if workers == 1:
+        return {year: run((vacancy, year)) for year in year_rows}
+    large = sorted((year for year in year_rows if year_rows[year] >= small_year_rows), key=year_rows.get, reverse=True)
+    small = [year for year in year_rows if year_rows[year] < small_year_rows]
+    results = {}
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        tasks = {executor.submit(run, (vacancy, year)): year for year in large}
+        small_results = executor.map(run, [(vacancy, year) for year in small],
+                                     chunksize=max(1, math.ceil(len(small) / workers)))
+        for task in futures.as_completed(tasks):
+            results[tasks[task]] = task.result()
+        results.update(zip(small, small_results))
+    return results
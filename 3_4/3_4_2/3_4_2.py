@@ -1,5 +1,10 @@
+import argparse
+import base64
+import functools
+import io
 import math
-from concurrent import futures
+import os
+import sys
 from statistics import mean
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -7,7 +12,14 @@ import numpy as np
 from jinja2 import Environment, FileSystemLoader
 import pdfkit
 
-date_df = pd.read_csv('C:\\Users\vinni\\PycharmProjects\\Vinnik\\3_4\\3_4_2\\curr.csv')
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "2_1"))
+import report_cache
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "3_2"))
+import year_pool
+
+CURRENCY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'curr.csv')
+date_df = pd.read_csv(CURRENCY_FILE)
 
 
 class Multithreading:
@@ -50,6 +62,13 @@ class Salary:
         elif not (math.isnan(salary_from)) and not (math.isnan(salary_to)):
             return mean([salary_from, salary_to]) * salary_value
 
+    def convert(df):
+        df["salary"] = df.apply(lambda row: Salary.get_salary(row["salary_from"],
+                                                              row["salary_to"],
+                                                              row["salary_currency"],
+                                                              row["published_at"][:7].split("-")), axis=1)
+        return df
+
 
 class UserInput:
     def __init__(self):
@@ -59,20 +78,16 @@ class UserInput:
 
 class Report:
     def __init__(self, vac_name, dicts_by_year):
-        self.generate_image(vac_name, dicts_by_year)
-        self.generate_pdf(vac_name, dicts_by_year)
+        image = self.generate_image(vac_name, dicts_by_year)
+        self.generate_pdf(vac_name, dicts_by_year, image)
 
     @staticmethod
-    def generate_pdf(vac_name, dicts_by_year):
-        env = Environment(loader=FileSystemLoader('..'))
-        template = env.get_template("pdf_template.html")
+    def generate_pdf(vac_name, dicts_by_year, image):
+        pdf_template = get_template().render(
+            {'name': vac_name, 'image': image_uri(image), 'by_year': dicts_by_year})
 
-        pdf_template = template.render(
-            {'name': vac_name, 'by_year': dicts_by_year})
-
-        options = {'enable-local-file-access': None}
         config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options=options)
+        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config)
 
     @staticmethod
     def generate_image(vac_name, dicts_by_year):
@@ -101,7 +116,20 @@ class Report:
         ax.grid(True, axis="y")
 
         plt.tight_layout()
-        plt.savefig("graph.png")
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+        plt.close(fig)
+        return buffer.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def get_template():
+    env = Environment(loader=FileSystemLoader(os.path.dirname(os.path.abspath(__file__))))
+    return env.get_template("pdf_template.html")
+
+
+def image_uri(image):
+    return "data:image/png;base64," + base64.b64encode(image).decode("ascii")
 
 
 class SplitData:
@@ -125,24 +153,31 @@ class Sorting:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Отчет по вакансиям с обработкой годов в пуле процессов")
+    parser.add_argument("--workers", type=int, help="количество процессов, по умолчанию по числу процессоров")
+    arguments = parser.parse_args()
+
     temp = UserInput()
     file, vac = temp.file_name, temp.vacancy_name
+    cache = report_cache.ReportCache()
+    parameters = {"report": "3_4_2", "vacancy_name": vac, "currencies": cache.file_hash(CURRENCY_FILE)}
+    cache_key = cache.key(file, **parameters)
+    if cache.restore(cache_key) is not None:
+        print("Отчет взят из кэша: report.pdf")
+        sys.exit()
     make_csv = SplitData(file)
     df = make_csv.dataframe
     years = make_csv.years
 
-    df["salary"] = df.apply(lambda row: Salary.get_salary(row["salary_from"],
-                                                          row["salary_to"],
-                                                          row["salary_currency"],
-                                                          row["published_at"][:7].split("-")), axis=1)
+    Salary.convert(df)
 
     salaries_by_year, vacancies_by_year, inp_vacancy_salary, inp_vacancy_count = {}, {}, {}, {}
 
-    executor = futures.ProcessPoolExecutor()
-    processes = []
+    year_rows = df["years"].value_counts().to_dict()
+    results = year_pool.year_statistics(Multithreading.run, vac, {year: year_rows[year] for year in years},
+                                        arguments.workers)
     for year in years:
-        args = (vac, year)
-        returned_list = executor.submit(Multithreading.run(), args).result()
+        returned_list = results[year]
         salaries_by_year.update(returned_list[0])
         vacancies_by_year.update(returned_list[1])
         inp_vacancy_salary.update(returned_list[2])
@@ -157,3 +192,4 @@ if __name__ == "__main__":
                           Sorting.dict_sort(vacancies_by_year), Sorting.dict_sort(inp_vacancy_count)]
 
     report = Report(temp.vacancy_name, dicts_list_by_year)
+    cache.store(cache_key, ["report.pdf"], parameters=parameters)
@@ -1,10 +1,18 @@
+import base64
+import functools
+import io
 import math
+import os
+import sys
 from statistics import mean
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from jinja2 import Environment, FileSystemLoader
 import pdfkit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "2_1"))
+import report_cache
 from matplotlib import ticker
 
 
@@ -45,22 +53,19 @@ class Sorting:
 
 class Report:
     def __init__(self, vac_name, region, dicts_by_area, dicts_by_year, vac_with_others):
-        self.generate_image(vac_name, region, dicts_by_area, dicts_by_year, vac_with_others)
-        self.generate_pdf(vac_name, region, dicts_by_area, dicts_by_year)
+        image = self.generate_image(vac_name, region, dicts_by_area, dicts_by_year, vac_with_others)
+        self.generate_pdf(vac_name, region, dicts_by_area, dicts_by_year, image)
 
     @staticmethod
-    def generate_pdf(vac_name, region, dicts_by_area, dicts_by_year):
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template("pdf_template.html")
-
-        pdf_template = template.render(
-            {'name': vac_name, 'reg': region, 'by_area': dicts_by_area, 'by_year': dicts_by_year,
+    def generate_pdf(vac_name, region, dicts_by_area, dicts_by_year, image):
+        pdf_template = get_template().render(
+            {'name': vac_name, 'image': image_uri(image), 'reg': region, 'by_area': dicts_by_area,
+             'by_year': dicts_by_year,
              'keys_0_area': list(dicts_by_area[0].keys()), 'values_0_area': list(dicts_by_area[0].values()),
              'keys_1_area': list(dicts_by_area[1].keys()), 'values_1_area': list(dicts_by_area[1].values())})
 
-        options = {'enable-local-file-access': None}
         config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options=options)
+        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config)
 
     @staticmethod
     def generate_image(vac_name, region, dicts_by_area, dicts_by_year, vac_with_others):
@@ -115,11 +120,30 @@ class Report:
         ax.axis('equal')
 
         plt.tight_layout()
-        plt.savefig("graph.png")
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png")
+        plt.close(fig)
+        return buffer.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def get_template():
+    env = Environment(loader=FileSystemLoader(os.path.dirname(os.path.abspath(__file__))))
+    return env.get_template("pdf_template.html")
+
+
+def image_uri(image):
+    return "data:image/png;base64," + base64.b64encode(image).decode("ascii")
 
 
 temp = UserInput()
 file, vac, reg = temp.file_name, temp.vacancy_name, temp.region
+cache = report_cache.ReportCache()
+parameters = {"report": "3_4_3", "vacancy_name": vac, "region": reg}
+cache_key = cache.key(file, **parameters)
+if cache.restore(cache_key) is not None:
+    print("Отчет взят из кэша: report.pdf")
+    sys.exit()
 df = pd.read_csv(file)
 
 df["years"] = df["published_at"].apply(lambda date: int(".".join(date[:4].split("-"))))
@@ -160,3 +184,4 @@ dicts_list_by_area = [Sorting.area_dict_sort(salaries_areas), Sorting.area_dict_
 dicts_list_by_year = [Sorting.dict_sort(inp_vacancy_salary), Sorting.dict_sort(inp_vacancy_count)]
 
 report = Report(vac, reg, dicts_list_by_area, dicts_list_by_year, others)
+cache.store(cache_key, ["report.pdf"], parameters=parameters)
@@ -0,0 +1,70 @@
+import argparse
+import csv
+import random
+
+HEADER = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+NAMES = ['Программист', 'Программист Python', 'Java-разработчик', 'Аналитик', 'Системный аналитик',
+         'Тестировщик', 'Менеджер проектов', 'Дизайнер', 'Инженер', 'Бухгалтер', 'Программист 1С',
+         'Frontend-разработчик', 'Специалист технической поддержки', 'Администратор', 'Data Scientist']
+AREAS = ['Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 'Казань', 'Нижний Новгород',
+         'Краснодар', 'Самара', 'Ростов-на-Дону', 'Уфа', 'Воронеж', 'Пермь', 'Омск', 'Челябинск',
+         'Минск', 'Алматы', 'Тверь', 'Томск', 'Ярославль', 'Иркутск']
+AREA_WEIGHTS = [40, 15, 5, 5, 4, 4, 3, 3, 3, 2, 2, 2, 2, 2, 2, 2, 1, 1, 1, 1]
+CURRENCIES = ['RUR', 'USD', 'EUR', 'KZT', 'UAH', 'BYR']
+CURRENCY_WEIGHTS = [90, 4, 2, 2, 1, 1]
+FIRST_YEAR, LAST_YEAR, LAST_MONTH = 2003, 2022, 7
+BATCH_SIZE = 10000
+
+
+def generate_rows(rows, seed=0, missing=0.02):
+    """
+    Генерирует строки синтетических вакансий. При одинаковых rows и seed строки всегда одинаковые.
+    Args:
+        rows (int): Количество вакансий
+        seed (int): Начальное значение генератора случайных чисел
+        missing (float): Доля вакансий без одной из границ вилки оклада
+    Yields:
+        list: Строка csv файла
+    """
+    generator = random.Random(seed)
+    for _ in range(rows):
+        year = generator.randint(FIRST_YEAR, LAST_YEAR)
+        month = generator.randint(1, LAST_MONTH if year == LAST_YEAR else 12)
+        salary_from = generator.randrange(10000, 300000, 1000)
+        salary_to = salary_from + generator.randrange(0, 150000, 1000)
+        row = [generator.choice(NAMES), float(salary_from), float(salary_to),
+               generator.choices(CURRENCIES, CURRENCY_WEIGHTS)[0], generator.choices(AREAS, AREA_WEIGHTS)[0],
+               '{0}-{1:02}-{2:02}T{3:02}:{4:02}:00+0300'.format(year, month, generator.randint(1, 28),
+                                                                generator.randint(0, 23), generator.randint(0, 59))]
+        if generator.random() < missing:
+            row[generator.choice((1, 2))] = ''
+        yield row
+
+
+def generate_csv(file_name, rows, seed=0):
+    """
+    Записывает синтетические вакансии в csv файл в формате, который ожидают DataSet.csv_reader и SplitData.
+    Args:
+        file_name (str): Название файла
+        rows (int): Количество вакансий
+        seed (int): Начальное значение генератора случайных чисел
+    """
+    with open(file_name, 'w', encoding='utf-8-sig', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADER)
+        batch = []
+        for row in generate_rows(rows, seed):
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                writer.writerows(batch)
+                batch = []
+        writer.writerows(batch)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Генератор синтетического csv файла с вакансиями')
+    parser.add_argument('output', help='название csv файла')
+    parser.add_argument('--rows', type=int, default=10000, help='количество вакансий (от 10 тыс. до 50 млн.)')
+    parser.add_argument('--seed', type=int, default=0, help='начальное значение генератора случайных чисел')
+    arguments = parser.parse_args()
+    generate_csv(arguments.output, arguments.rows, arguments.seed)
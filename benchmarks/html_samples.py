@@ -0,0 +1,47 @@
+import random
+import re
+
+WORDS = ['опыт', 'работы', 'обязанности', 'требования', 'условия', 'команда', 'проект', 'Python', 'SQL', 'график']
+TAGS = ['<p>', '</p>', '<strong>', '</strong>', '<li>', '</li>', '<ul>', '</ul>', '<br/>', '<br />',
+        '<a href="https://hh.ru">', '</a>', '<em>']
+SPACES = [' ', '  ', '\n', '\t', '\r\n', '\xa0', ' ', '　', '\x1c']
+EDGE_CASES = ['', ' ', '<>', '<<>>', 'a<b', 'a>b', '<a\nb>c', 'x <a\n<b>c', '<a<b>c>d', '1 < 2 и 3 > 2',
+              '  <p> текст </p>  ', '<p>\n\t\xa0</p>', 'без тегов', '<br>' * 5, '<p>a</p>\n<p>b</p>',
+              '<img src="1.png"/>текст', ' строка ', 'a\x1fb\x85c', '<<a>>b<<', 'тег <не\nзакрыт']
+
+
+def reference_clean(string):
+    """
+    Прежняя реализация Vacancy.clear_html, с которой сверяется text_cleaner.
+    Args:
+        string (str): Строка
+    Returns:
+        str: Строку без html тегов и лишних пробелов
+    """
+    result = re.sub(r'<.*?>', '', string)
+    result = re.sub(r'\s+', ' ', result)
+    return result.strip()
+
+
+def generate_descriptions(count, seed=0, unique=0.5):
+    """
+    Генерирует описания вакансий с тегами, переносами строк и разными пробельными символами.
+    Args:
+        count (int): Количество описаний
+        seed (int): Начальное значение генератора случайных чисел
+        unique (float): Доля уникальных описаний, остальные повторяют уже сгенерированные
+    Returns:
+        list: Описания
+    """
+    generator = random.Random(seed)
+    descriptions = []
+    for _ in range(count):
+        if descriptions and generator.random() > unique:
+            descriptions.append(generator.choice(descriptions))
+            continue
+        parts = []
+        for _ in range(generator.randint(5, 200)):
+            parts.append(generator.choice(TAGS) if generator.random() < 0.3 else generator.choice(WORDS))
+            parts.append(generator.choice(SPACES) if generator.random() < 0.3 else ' ')
+        descriptions.append(''.join(parts))
+    return descriptions
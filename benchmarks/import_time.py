@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = {
+    '2_2_2': '2_2',
+    'table_5_2': '2_1',
+    'pdf_2_1_3': '2_1',
+}
+
+
+def import_time(module_name, repeat=5):
+    """
+    Замеряет время импорта модуля через python -X importtime в новом процессе.
+    Args:
+        module_name (str): Название модуля
+        repeat (int): Количество запусков, берется лучший результат
+    Returns:
+        tuple: Время импорта модуля в миллисекундах и время импорта каждой его прямой зависимости
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [os.path.join(ROOT, directory) for directory in sorted(set(MODULES.values()))]))
+    best = None
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                  '__import__({0!r})'.format(module_name)],
+                                 env=environment, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        if process.returncode != 0:
+            raise RuntimeError(process.stderr.strip().splitlines()[-1])
+        total, children = 0, {}
+        for line in process.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            if depth == 0:
+                if name.strip() == module_name:
+                    total = int(cumulative) / 1000
+                    break
+                children = {}
+            elif depth == 1:
+                children[name.strip()] = int(cumulative) / 1000
+        if best is None or total < best[0]:
+            best = (total, children)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замер времени импорта модулей отчетов (python -X importtime)')
+    parser.add_argument('--modules', nargs='+', choices=list(MODULES), default=list(MODULES))
+    parser.add_argument('--repeat', type=int, default=5, help='количество запусков, берется лучший результат')
+    parser.add_argument('--top', type=int, default=5, help='сколько самых долгих вложенных импортов выводить')
+    parser.add_argument('--limit', nargs='+', metavar='MODULE=MS', default=[],
+                        help='допустимое время импорта, при превышении программа завершается с кодом 1')
+    arguments = parser.parse_args()
+    limits = {name: float(value) for name, value in (limit.split('=') for limit in arguments.limit)}
+
+    failed = False
+    for module_name in arguments.modules:
+        total, children = import_time(module_name, arguments.repeat)
+        slowest = dict(sorted(children.items(), key=lambda item: -item[1])[:arguments.top])
+        result = {'module': module_name, 'import_ms': round(total, 1),
+                  'slowest': {name: round(value, 1) for name, value in slowest.items()}}
+        if module_name in limits and total > limits[module_name]:
+            result['limit_ms'] = limits[module_name]
+            failed = True
+        print(json.dumps(result, ensure_ascii=False))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
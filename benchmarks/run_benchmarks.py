@@ -0,0 +1,137 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import generate_vacancies
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VACANCY_NAME = 'Программист'
+
+
+def load(directory, module_name):
+    """
+    Импортирует модуль задания по имени файла (имена вида 3_2_3 нельзя импортировать обычным import).
+    Каталог модуля добавляется в sys.path, чтобы дочерние процессы multiprocessing тоже могли его найти.
+    Args:
+        directory (str): Каталог модуля относительно корня репозитория
+        module_name (str): Имя файла модуля без .py
+    Returns:
+        module: Загруженный модуль
+    """
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    return importlib.import_module(module_name)
+
+
+PIPELINES = {
+    '2_1_1': ('2_1', '2_1_1', lambda module, file_name: module.DataSet(file_name, VACANCY_NAME).get_statistic()),
+    '2_1_columnar': ('2_1', 'pdf_2_1_3', lambda module, file_name:
+                     module.ColumnarDataSet(file_name, VACANCY_NAME, cache_dir=None).get_statistic()),
+    '2_1_parallel': ('2_1', 'pdf_2_1_3', lambda module, file_name:
+                     module.ParallelDataSet(file_name, VACANCY_NAME, os.cpu_count()).get_statistic()),
+    '3_2_2': ('3_2', '3_2_2', lambda module, file_name: module.get_statistic(file_name, VACANCY_NAME)),
+    '3_2_3': ('3_2', '3_2_3', lambda module, file_name: module.get_statistic(file_name, VACANCY_NAME)),
+    '3_4_conversion': (os.path.join('3_4', '3_4_2'), '3_4_2', lambda module, file_name:
+                       module.Salary.convert(module.pd.read_csv(file_name))),
+}
+
+
+def peak_rss_mb():
+    """
+    Находит пиковое потребление памяти текущим процессом и его дочерними процессами.
+    Returns:
+        float: Пиковый RSS в мегабайтах или None, если модуль resource недоступен (Windows)
+    """
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_child(pipeline, file_name, rows):
+    """
+    Выполняет один конвейер в текущем процессе и печатает результат в виде json.
+    Импорт модуля в замер не входит.
+    Запускается в отдельном процессе и во временном каталоге, чтобы пиковая память и файлы
+    (new_csv_files, кэши) не переходили из одного замера в другой.
+    Args:
+        pipeline (str): Название конвейера
+        file_name (str): Название csv файла
+        rows (int): Количество вакансий в файле
+    """
+    os.makedirs('new_csv_files', exist_ok=True)
+    directory, module_name, run = PIPELINES[pipeline]
+    module = load(directory, module_name)
+    wall, cpu = time.perf_counter(), time.process_time()
+    run(module, file_name)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(json.dumps({'pipeline': pipeline, 'rows': rows, 'seconds': round(wall, 4), 'cpu_seconds': round(cpu, 4),
+                      'rows_per_second': round(rows / wall, 1) if wall else None, 'peak_rss_mb': peak_rss_mb()}))
+
+
+def run_pipeline(pipeline, file_name, rows):
+    """
+    Запускает конвейер в отдельном процессе.
+    Args:
+        pipeline (str): Название конвейера
+        file_name (str): Название csv файла
+        rows (int): Количество вакансий в файле
+    Returns:
+        dict: Результат замера или описание ошибки
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        process = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', pipeline,
+                                  os.path.abspath(file_name), '--rows', str(rows)],
+                                 cwd=work_dir, capture_output=True, text=True, encoding='utf-8')
+    if process.returncode != 0:
+        return {'pipeline': pipeline, 'rows': rows, 'error': process.stderr.strip().splitlines()[-1:]}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замеры скорости конвейеров статистики по вакансиям')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000],
+                        help='размеры синтетических файлов (от 10 тыс. до 50 млн. строк)')
+    parser.add_argument('--pipelines', nargs='+', choices=list(PIPELINES), default=list(PIPELINES))
+    parser.add_argument('--seed', type=int, default=0, help='начальное значение генератора данных')
+    parser.add_argument('--data-dir', default='benchmark_data', help='каталог для сгенерированных csv файлов')
+    parser.add_argument('--output', default='benchmark_results.json', help='json файл с результатами')
+    parser.add_argument('--child', nargs=2, metavar=('PIPELINE', 'CSV'), help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.child:
+        run_child(arguments.child[0], arguments.child[1], arguments.rows[0])
+        return
+
+    os.makedirs(arguments.data_dir, exist_ok=True)
+    results = []
+    for rows in arguments.rows:
+        file_name = os.path.join(arguments.data_dir, 'vacancies_{0}_{1}.csv'.format(rows, arguments.seed))
+        if not os.path.exists(file_name):
+            generate_vacancies.generate_csv(file_name, rows, arguments.seed)
+        for pipeline in arguments.pipelines:
+            result = run_pipeline(pipeline, file_name, rows)
+            results.append(result)
+            print(json.dumps(result, ensure_ascii=False))
+
+    with open(arguments.output, 'w', encoding='utf-8') as output:
+        json.dump({'python': platform.python_version(), 'platform': platform.platform(),
+                   'cpu_count': os.cpu_count(), 'seed': arguments.seed, 'results': results},
+                  output, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
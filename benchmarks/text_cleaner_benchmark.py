@@ -0,0 +1,49 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, '2_1'))
+
+import text_cleaner
+from html_samples import EDGE_CASES, generate_descriptions, reference_clean
+
+
+def measure(function, values):
+    start = time.perf_counter()
+    result = function(values)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замер и сверка очистки html в описаниях вакансий')
+    parser.add_argument('--count', type=int, default=100000, help='количество описаний')
+    parser.add_argument('--unique', type=float, default=0.5, help='доля уникальных описаний')
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+
+    descriptions = EDGE_CASES + generate_descriptions(arguments.count, arguments.seed, arguments.unique)
+    text_cleaner.clean_html.cache_clear()
+    results = {
+        'reference': measure(lambda values: [reference_clean(value) for value in values], descriptions),
+        'strip_html': measure(lambda values: [text_cleaner.strip_html(value) for value in values], descriptions),
+        'clean_html': measure(lambda values: [text_cleaner.clean_html(value) for value in values], descriptions),
+        'clean_html_warm': measure(lambda values: [text_cleaner.clean_html(value) for value in values], descriptions),
+        'clean_batch': measure(text_cleaner.clean_batch, descriptions),
+    }
+
+    expected = results['reference'][1]
+    mismatches = [index for name, (_, result) in results.items() for index, value in enumerate(result)
+                  if value != expected[index]]
+    for index in sorted(set(mismatches))[:10]:
+        print('Расхождение: {0!r} -> {1!r}'.format(descriptions[index], expected[index]), file=sys.stderr)
+    print(json.dumps({'count': len(descriptions), 'unique': len(set(descriptions)),
+                      'seconds': {name: round(seconds, 4) for name, (seconds, _) in results.items()},
+                      'mismatches': len(set(mismatches))}, ensure_ascii=False))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
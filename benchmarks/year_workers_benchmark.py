@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent import futures
+
+import generate_vacancies
+from run_benchmarks import VACANCY_NAME, load
+
+
+def serialized(module, year_rows):
+    """
+    Прежняя схема 3_2_3 до year_pool: задача каждого года отправляется в пул только после того, как готов предыдущий год.
+    Args:
+        module (module): Модуль 3_2_3
+        year_rows (dict): Год -> количество вакансий
+    Returns:
+        dict: Год -> результат Multithreading.run
+    """
+    results = {}
+    with futures.ProcessPoolExecutor() as executor:
+        for year in year_rows:
+            results[year] = executor.submit(module.Multithreading.run, (VACANCY_NAME, year)).result()
+    return results
+
+
+def measure(function, *args, repeat=3):
+    """
+    Замеряет лучшее время из нескольких запусков.
+    Args:
+        function (function): Замеряемая функция
+        args: Аргументы функции
+        repeat (int): Количество запусков
+    Returns:
+        tuple: Лучшее время в секундах и результат последнего запуска
+    """
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замер обработки годов в 3_2_3: по очереди и в пуле процессов')
+    parser.add_argument('--rows', type=int, default=500000, help='размер синтетического файла')
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}),
+                        help='количество процессов для параллельной схемы')
+    parser.add_argument('--small-year-rows', type=int, default=None,
+                        help='годы меньше этого размера обрабатываются пачками через map')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    arguments = parser.parse_args()
+
+    module = load('3_2', '3_2_3')
+    year_pool = module.year_pool
+    small_year_rows = arguments.small_year_rows or year_pool.SMALL_YEAR_ROWS
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        os.makedirs('new_csv_files')
+        generate_vacancies.generate_csv('vacancies.csv', arguments.rows, arguments.seed)
+        data = module.SplitData('vacancies.csv')
+        year_rows = data.dataframe['years'].value_counts().to_dict()
+        year_rows = {year: year_rows[year] for year in data.years}
+
+        baseline, expected = measure(serialized, module, year_rows, repeat=arguments.repeat)
+        results = {'rows': arguments.rows, 'years': len(year_rows), 'cpu_count': os.cpu_count(),
+                   'year_rows': {str(year): int(rows) for year, rows in sorted(year_rows.items())},
+                   'small_year_rows': small_year_rows,
+                   'serialized_seconds': round(baseline, 4), 'parallel': []}
+        for workers in arguments.workers:
+            seconds, result = measure(year_pool.year_statistics, module.Multithreading.run, VACANCY_NAME, year_rows,
+                                      workers, small_year_rows, repeat=arguments.repeat)
+            if result != expected:
+                raise SystemExit('Результат при {0} процессах отличается от последовательного'.format(workers))
+            results['parallel'].append({'workers': workers, 'seconds': round(seconds, 4),
+                                        'speedup': round(baseline / seconds, 2)})
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import frame_cache
+
+
+def test_frame_round_trips_strings_numbers_and_missing_values(tmp_path):
+    dataframe = pd.DataFrame({'name': ['Программист', 'Аналитик' * 1000, np.nan],
+                              'salary': [1.5, np.nan, 2.0], 'year': [2021, 2022, 2022]})
+    frame_cache.save_frame(dataframe, str(tmp_path / 'frame'))
+    loaded = frame_cache.open_frame(str(tmp_path / 'frame'))
+    assert loaded.equals(dataframe) and loaded.dtypes.equals(dataframe.dtypes)
+    assert os.path.getsize(tmp_path / 'frame' / '0.npy') < len('Аналитик' * 1000) * 2 + 1000
+
+
+def test_mixed_object_column_is_not_cached(tmp_path):
+    dataframe = pd.DataFrame({'value': np.array(['x', 1, 2.5], dtype=object)})
+    with pytest.raises(ValueError):
+        frame_cache.save_frame(dataframe, str(tmp_path / 'frame'))
+    file = tmp_path / 'vacancies.csv'
+    file.write_text('value\nx\n', encoding='utf-8')
+    cache_dir = tmp_path / 'cache'
+    loaded, _ = frame_cache.load_frame(str(file), lambda file_name: dataframe, str(cache_dir))
+    assert loaded is dataframe and os.listdir(cache_dir) == []
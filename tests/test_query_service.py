@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import urlopen
+
+import pytest
+
+import query_service
+
+TITLE = 'name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+ROWS = ('Программист,100000,200000,RUR,Москва,2021-03-01T10:00:00+0300\n'
+        'Аналитик,50000,70000,RUR,Казань,2021-05-01T10:00:00+0300\n'
+        'Программист,1000,3000,USD,Казань,2022-02-01T10:00:00+0300\n')
+
+
+def write(path, text, mtime):
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def service(tmp_path):
+    file = tmp_path / 'vacancies.csv'
+    write(file, TITLE + ROWS, 10 ** 18)
+    server = query_service.create_server(str(file), port=0, cache_dir=None, check_interval=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def get(path):
+        url = 'http://127.0.0.1:{0}{1}'.format(server.server_address[1], path)
+        try:
+            with urlopen(url, timeout=10) as response:
+                return response.status, json.loads(response.read())
+        except HTTPError as error:
+            return error.code, json.loads(error.read())
+
+    yield file, get
+    server.shutdown()
+    server.server_close()
+
+
+def test_years_for_profession_and_region(service):
+    _, get = service
+    status, years = get('/years?profession={0}&region={1}'.format(quote('Программист'), quote('Москва')))
+    assert status == 200
+    assert years == {'2021': {'salary': 105000, 'count': 2, 'profession_salary': 150000, 'profession_count': 1},
+                     '2022': {'salary': 121320, 'count': 1, 'profession_salary': 0, 'profession_count': 0}}
+
+
+def test_cities(service):
+    _, get = service
+    status, cities = get('/cities')
+    assert status == 200
+    assert cities['share'] == {'Казань': 0.6667, 'Москва': 0.3333}
+
+
+def test_unknown_path_and_missing_parameter(service):
+    _, get = service
+    assert get('/nothing')[0] == 404
+    status, body = get('/statistics')
+    assert status == 400
+    assert 'profession' in body['error']
+
+
+def test_statistics_error_is_server_error(service, monkeypatch):
+    _, get = service
+
+    def fail(columns, vacancy_name, region=''):
+        raise KeyError('XYZ')
+
+    monkeypatch.setattr(query_service.ColumnarDataSet, 'statistic_for', staticmethod(fail))
+    status, body = get('/years?profession=' + quote('Программист'))
+    assert status == 500
+    assert body['error'] == "KeyError: 'XYZ'"
+
+
+def test_reloads_changed_file(service):
+    file, get = service
+    write(file, TITLE + ROWS + 'Аналитик,60000,80000,RUR,Москва,2022-06-01T10:00:00+0300\n', 2 * 10 ** 18)
+    status, info = get('/info')
+    assert (status, info['rows'], info['reloads'], info['error']) == (200, 4, 1, None)
+
+
+@pytest.mark.parametrize('text', ['', TITLE])
+def test_keeps_previous_columns_when_file_has_no_vacancies(service, text):
+    file, get = service
+    write(file, text, 2 * 10 ** 18)
+    status, info = get('/info')
+    assert (status, info['rows'], info['reloads']) == (200, 3, 0)
+    assert info['error'].startswith('ValueError')
+    assert get('/years?profession=' + quote('Аналитик'))[1]['2021']['profession_count'] == 1
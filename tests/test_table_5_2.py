@@ -0,0 +1,105 @@
+import pytest
+
+import filter_expression
+import table_5_2
+from table_5_2 import DataSet
+
+TITLE = ('name,description,key_skills,experience_id,premium,employer_name,salary_from,salary_to,salary_gross,'
+         'salary_currency,area_name,published_at\n')
+ROWS = [
+    ('Программист', 'Python\nSQL', 'noExperience', 'True', 'Компания 1', 100000, 150000, 'RUR', 'Москва', '2021-03-01'),
+    ('Аналитик', 'SQL', 'between1And3', 'False', 'Компания 2', 50000, 70000, 'RUR', 'Казань', '2021-05-01'),
+    ('Программист', 'Python\nGit', 'between3And6', 'False', 'Компания 1', 1000, 3000, 'USD', 'Казань', '2022-02-01'),
+    ('Тестировщик', 'Git', 'moreThan6', 'True', 'Компания 3', 40000, 60000, 'RUR', 'Москва', '2021-03-01'),
+    ('Аналитик', 'Excel\nSQL', 'noExperience', 'False', 'Компания 2', 800, 1200, 'EUR', 'Уфа', '2020-12-31'),
+    ('Программист', 'Python', 'between1And3', 'True', 'Компания 3', 90000, 90000, 'RUR', 'Москва', '2022-07-15'),
+]
+QUERIES = [
+    ('', '', False, []),
+    ('Название региона: Москва', 'Оклад', False, []),
+    ('Навыки: Python AND NOT Компания: Компания 3', 'Дата публикации вакансии', True, [0, 5]),
+    ('Название региона IN (Москва, Казань) AND Оклад: 50000..100000', 'Название, Оклад DESC', False, [1]),
+    ('Дата публикации вакансии: 01.01.2021..31.12.2021 OR Премиум-вакансия: Да', 'Компания', True, [0, 3]),
+    ('Идентификатор валюты оклада: Рубли', '', True, [0, 2]),
+    ('Оклад в рублях: 60000', 'Опыт работы', False, []),
+]
+
+
+@pytest.fixture
+def file_name(tmp_path):
+    path = tmp_path / 'vacancies.csv'
+    lines = ['{0},Описание,"{1}",{2},{3},{4},{5},{6},True,{7},{8},{9}T10:00:00+0300\n'.format(*row) for row in ROWS]
+    path.write_text(TITLE + ''.join(lines), encoding='utf-8')
+    return str(path)
+
+
+def parse(text):
+    return filter_expression.parse(text, DataSet.cond_to_sort, DataSet.range_bounds) if text else []
+
+
+def streamed(file_name, filter_param, sort_param, sort_reverse, sort_range):
+    data_set = DataSet(file_name, parse(filter_param), sort_param, sort_reverse, sort_range)
+    data_set.csv_reader(stream=True)
+    data_set.filter_rows()
+    data_set.sort_rows()
+    data_set.get_range()
+    return data_set.get_rows()
+
+
+def test_query_matches_streaming_and_keeps_loaded_vacancies(file_name):
+    data_set = DataSet(file_name, [], '', False, [])
+    data_set.csv_reader()
+    vacancies = data_set.index.vacancies
+    loaded = list(vacancies)
+    for filter_param, sort_param, sort_reverse, sort_range in QUERIES:
+        result = data_set.query(parse(filter_param), sort_param, sort_reverse, sort_range)
+        assert [vacancy.get_list() for vacancy in result] == streamed(file_name, filter_param, sort_param,
+                                                                      sort_reverse, sort_range)
+        assert data_set.index.vacancies is vacancies and vacancies == loaded
+
+
+def test_query_uses_index(file_name):
+    data_set = DataSet(file_name, [], '', False, [])
+    result = data_set.query(parse('Название региона: Москва AND Навыки: Python'), 'Оклад', True, [])
+    assert data_set.plan.use_index
+    assert [vacancy.salary_from for vacancy in result] == [100000, 90000]
+
+
+def test_indexed_mode_runs_queries_until_declined(file_name, monkeypatch, capsys):
+    answers = iter([file_name,
+                    'Название региона: Москва', 'Оклад', 'Да', '', 'Название, Оклад', 'Да',
+                    '', 'Плохой', '', '', '', 'Да',
+                    'Название региона: Нигде', '', '', '', '', 'Нет'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    table_5_2.get_table(indexed=True)
+    output = capsys.readouterr().out
+    assert output.count('Программист') == 2 and 'Тестировщик' in output
+    assert 'Параметр сортировки некорректен' in output and output.endswith('Ничего не найдено\n')
+    assert next(answers, None) is None
+
+
+def test_plan_collects_positions_only_for_driver(file_name):
+    data_set = DataSet(file_name, [], '', False, [])
+    data_set.csv_reader()
+    expression = parse('Компания: Компания 3 AND Оклад: 20000..200000 AND NOT Название региона: Казань')
+    plan = table_5_2.QueryPlan(expression, data_set.index)
+    assert plan.root.driver.node.key == 'Компания' and plan.root.driver.selectivity == pytest.approx(2 / 6)
+    assert all(step.positions is None for step in plan.root.children)
+    assert plan.select() == [3, 5]
+    assert [step.positions is not None for step in plan.root.children] == [True, False, False]
+
+
+def test_skill_filter_probes_rare_skill_against_common_skill_set():
+    vacancies = [table_5_2.Vacancy({'name': 'Программист', 'description': '', 'key_skills': skills,
+                                    'experience_id': 'noExperience', 'premium': 'False', 'employer_name': 'Компания',
+                                    'salary_from': '1000', 'salary_to': '2000', 'salary_gross': 'True',
+                                    'salary_currency': 'RUR', 'area_name': 'Москва',
+                                    'published_at': '2022-01-01T10:00:00+0300'})
+                 for skills in ['Python'] * 997 + ['Python\nRust', 'Rust', 'Python\nRust']]
+    index = table_5_2.VacancyIndex(vacancies)
+    assert index.positions('Навыки', 'Python, Rust') == [997, 999]
+    common = index.skill_sets['Python']
+    assert index.positions('Навыки', 'Rust, Python') == [997, 999]
+    assert index.skill_sets['Python'] is common
+    assert index.positions('Навыки', 'Rust, Go') == []
+    assert index.count('Навыки', 'Python, Rust') == 3
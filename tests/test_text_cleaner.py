@@ -0,0 +1,19 @@
+import pytest
+
+import text_cleaner
+from html_samples import EDGE_CASES, generate_descriptions, reference_clean
+
+
+@pytest.mark.parametrize('text', EDGE_CASES)
+def test_edge_cases_match_reference(text):
+    expected = reference_clean(text)
+    assert text_cleaner.strip_html(text) == expected
+    assert text_cleaner.clean_html(text) == expected
+
+
+def test_generated_descriptions_match_reference():
+    descriptions = generate_descriptions(2000, seed=1)
+    expected = [reference_clean(text) for text in descriptions]
+    assert [text_cleaner.strip_html(text) for text in descriptions] == expected
+    assert [text_cleaner.clean_html(text) for text in descriptions] == expected
+    assert text_cleaner.clean_batch(descriptions) == expected